@@ -19,13 +19,16 @@ Requires
 * GStreamer 1.x with gst-plugins-good (``rtph264pay``, ``udpsink``).
 * For Pi Camera: ``rpicam-vid`` CLI (ships with Raspberry Pi OS Bookworm+).
   Falls back to ``libcamera-vid`` on older installations.
-* For USB camera: GStreamer ``v4l2src`` + ``x264enc`` **or** ``v4l2h264enc``.
+* For USB camera: GStreamer ``v4l2src`` + ``v4l2h264enc`` (Pi hardware
+  encoder, preferred) **or** ``x264enc`` (software fallback).
 """
 from __future__ import annotations
 
 import enum
+import functools
 import logging
 import os
+import selectors
 import shutil
 import subprocess
 import signal
@@ -43,7 +46,7 @@ logger = logging.getLogger("falconia.camera_manager")
 DEFAULT_WIDTH = 1280
 DEFAULT_HEIGHT = 720
 DEFAULT_FPS = 30
-DEFAULT_BITRATE = 500          # kbit/s for x264enc
+DEFAULT_BITRATE = 500          # kbit/s (x264enc; scaled to bit/s for v4l2h264enc)
 DEFAULT_PORT = 5000
 DEFAULT_HOST = "127.0.0.1"
 
@@ -51,6 +54,20 @@ DEFAULT_HOST = "127.0.0.1"
 RECONNECT_DELAY = 3.0
 MAX_RECONNECT_ATTEMPTS = 5
 
+# How much of each pipeline process's stderr to keep for crash diagnostics.
+STDERR_TAIL_BYTES = 4096
+
+# Small leaky queue for raw frames only: decouples capture from the encoder
+# and drops the oldest frame instead of back-pressuring the camera.
+LEAKY_QUEUE = [
+    "queue", "max-size-buffers=2", "max-size-bytes=0", "max-size-time=0",
+    "leaky=downstream",
+]
+
+# Non-leaky queue for the encoded stream: dropping an H.264 access unit
+# corrupts every frame that references it until the next IDR.
+ENCODED_QUEUE = ["queue"]
+
 
 # ---------------------------------------------------------------------------
 # Camera type enumeration
@@ -67,17 +84,30 @@ class CameraType(enum.Enum):
 # Detection helpers
 # ---------------------------------------------------------------------------
 
-def _find_video_devices() -> list[str]:
-    """Return a sorted list of ``/dev/videoN`` device paths."""
+@functools.lru_cache(maxsize=1)
+def _scan_video_devices() -> tuple[str, ...]:
     dev = Path("/dev")
-    return sorted(str(p) for p in dev.glob("video*") if p.is_char_device())
+    return tuple(sorted(str(p) for p in dev.glob("video*") if p.is_char_device()))
+
+
+def _find_video_devices(refresh: bool = False) -> list[str]:
+    """Return a sorted list of ``/dev/videoN`` device paths.
+
+    The scan is cached; pass *refresh=True* to re-read ``/dev`` (e.g. after
+    hot-plugging a USB camera).
+    """
+    if refresh:
+        _scan_video_devices.cache_clear()
+    return list(_scan_video_devices())
 
 
+@functools.lru_cache(maxsize=1)
 def _get_rpicam_command() -> Optional[str]:
     """Return the Pi Camera CLI name available on this system.
 
     Prefers ``rpicam-vid`` (Bookworm+); falls back to ``libcamera-vid``.
-    Returns *None* if neither is found.
+    Returns *None* if neither is found.  The result is cached for the life
+    of the process.
     """
     for cmd in ("rpicam-vid", "libcamera-vid"):
         if shutil.which(cmd) is not None:
@@ -85,6 +115,69 @@ def _get_rpicam_command() -> Optional[str]:
     return None
 
 
+def _seal_inherited_fds() -> bool:
+    """Mark every descriptor above stderr close-on-exec.
+
+    Python opens its own fds non-inheritable (PEP 446), but C libraries such
+    as OpenCV's V4L2 backend or RPi.GPIO may not.  Sealing them lets children
+    be spawned with ``close_fds=False`` while inheriting only the std streams
+    they are handed.  Returns *False* if the open fds can't be listed.
+    """
+    try:
+        names = os.listdir("/proc/self/fd")
+    except OSError:
+        return False
+    for name in names:
+        fd = int(name)
+        if fd <= 2:
+            continue
+        try:
+            if os.get_inheritable(fd):
+                os.set_inheritable(fd, False)
+        except OSError:
+            pass  # closed since the listing (e.g. listdir's own fd)
+    return True
+
+
+def _spawn(argv: list[str], **kwargs: object) -> subprocess.Popen:
+    """Start a pipeline process via ``posix_spawn`` rather than fork+exec.
+
+    CPython's subprocess only takes its ``posix_spawn`` path for an absolute
+    executable with ``close_fds=False``; before 3.10 every other path
+    ``fork()``s, building copy-on-write page tables for an interpreter that
+    has NumPy / OpenCV / Flask loaded.  Stray descriptors are sealed first so
+    nothing but the std streams reaches the child; if that isn't possible
+    the default ``close_fds=True`` launch is used.
+    """
+    if not _seal_inherited_fds():
+        return subprocess.Popen(argv, **kwargs)
+    exe = shutil.which(argv[0]) or argv[0]
+    return subprocess.Popen([exe, *argv[1:]], close_fds=False, **kwargs)
+
+
+def _gst_element_available(element: str) -> bool:
+    """Return *True* if ``gst-inspect-1.0`` can find the given element."""
+    gst_inspect = shutil.which("gst-inspect-1.0")
+    if gst_inspect is None:
+        return False
+    try:
+        proc = subprocess.run(
+            [gst_inspect, element],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            timeout=5,
+            env={**os.environ, "GST_PAGER": "cat", "PAGER": "cat"},
+        )
+    except Exception:
+        return False
+    return proc.returncode == 0
+
+
+# Probed once at import: the Pi's V4L2 M2M hardware H.264 encoder.
+HW_H264_ENCODER_AVAILABLE = _gst_element_available("v4l2h264enc")
+
+
 def _is_libcamera_available() -> bool:
     """Check whether ``rpicam-vid`` or ``libcamera-vid`` is installed."""
     return _get_rpicam_command() is not None
@@ -151,6 +244,7 @@ def build_picamera_pipeline(
         "--height", str(height),
         "--framerate", str(fps),
         "--inline",                        # emit SPS/PPS with every IDR
+        "--intra", str(fps),               # one IDR per second for quick joins
         "-n",                              # no preview window
         "--codec", "h264",
         "--output", "-",                   # write to stdout
@@ -165,16 +259,42 @@ def build_picamera_pipeline(
         # h264parse: re-frames / timestamps the raw H.264 NALUs
         "h264parse",
         "!",
+        # queue: hand off to the network thread
+        *ENCODED_QUEUE,
+        "!",
         # rtph264pay: packetises H.264 into RTP for network transport
         "rtph264pay", "config-interval=1", "pt=96",
         "!",
-        # udpsink: sends RTP packets over UDP to the target
+        # udpsink: sends RTP packets over UDP to the target; no clock sync
         "udpsink", f"host={target_ip}", f"port={target_port}",
+        "sync=false", "async=false",
     ]
 
     return [libcamera_cmd, gst_cmd]
 
 
+def build_appsrc_pipeline(target_ip: str, target_port: int) -> str:
+    """Return a ``Gst.parse_launch`` string for in-process Pi Camera streaming.
+
+    Encoded H.264 access units are pushed into ``appsrc`` (named ``src``)
+    by Picamera2's encoder; the rest matches Stage 2 of
+    :func:`build_picamera_pipeline`.
+    """
+    return " ".join([
+        "appsrc", "name=src", "is-live=true", "format=time", "do-timestamp=true",
+        "caps=video/x-h264,stream-format=byte-stream,alignment=au",
+        "!",
+        "h264parse",
+        "!",
+        *ENCODED_QUEUE,
+        "!",
+        "rtph264pay", "config-interval=1", "pt=96",
+        "!",
+        "udpsink", f"host={target_ip}", f"port={target_port}",
+        "sync=false", "async=false",
+    ])
+
+
 def build_usb_camera_pipeline(
     target_ip: str,
     target_port: int,
@@ -183,21 +303,64 @@ def build_usb_camera_pipeline(
     height: int = DEFAULT_HEIGHT,
     fps: int = DEFAULT_FPS,
     bitrate: int = DEFAULT_BITRATE,
+    prefer_hw_encoder: bool = True,
 ) -> list[str]:
     """Return a single ``gst-launch-1.0`` command for USB camera streaming.
 
-    Pipeline:
-        v4l2src → videoconvert → x264enc (software, zero-latency) →
+    Pipeline (hardware, when ``v4l2h264enc`` is available):
+        v4l2src → v4l2convert → v4l2h264enc → h264parse →
+        rtph264pay → udpsink
+
+    Pipeline (software fallback):
+        v4l2src → videoconvert → x264enc (zero-latency) →
         rtph264pay → udpsink
 
-    NOTE: For hardware encoding on a Pi, replace ``x264enc`` with
-    ``v4l2h264enc`` if available.  This is a TODO for future optimisation.
+    Set *prefer_hw_encoder* to *False* to force the ``x264enc`` path.
     """
+    if prefer_hw_encoder and HW_H264_ENCODER_AVAILABLE:
+        return [
+            "gst-launch-1.0", "-e",
+            # v4l2src: captures frames from a V4L2 device
+            "v4l2src", f"device={device}",
+            "!",
+            # queue: run capture on its own thread
+            *LEAKY_QUEUE,
+            "!",
+            # Negotiate a specific resolution / framerate from the source
+            f"video/x-raw,width={width},height={height},framerate={fps}/1",
+            "!",
+            # v4l2convert: colourspace conversion on the ISP, not the CPU
+            "v4l2convert",
+            "!",
+            # v4l2h264enc: Pi hardware H.264 encoder (V4L2 M2M)
+            "v4l2h264enc",
+            "extra-controls=controls,h264_profile=4,"
+            f"video_bitrate={bitrate * 1000},h264_i_frame_period={fps}",
+            "!",
+            "video/x-h264,level=(string)4",
+            "!",
+            # h264parse: re-frames the encoder output for the payloader
+            "h264parse",
+            "!",
+            # queue: hand off to the network thread
+            *ENCODED_QUEUE,
+            "!",
+            # rtph264pay: packetise H.264 into RTP
+            "rtph264pay", "config-interval=1", "pt=96",
+            "!",
+            # udpsink: send RTP over UDP
+            "udpsink", f"host={target_ip}", f"port={target_port}",
+            "sync=false", "async=false",
+        ]
+
     return [
         "gst-launch-1.0", "-e",
         # v4l2src: captures frames from a V4L2 device
         "v4l2src", f"device={device}",
         "!",
+        # queue: run capture on its own thread
+        *LEAKY_QUEUE,
+        "!",
         # Negotiate a specific resolution / framerate from the source
         f"video/x-raw,width={width},height={height},framerate={fps}/1",
         "!",
@@ -210,11 +373,15 @@ def build_usb_camera_pipeline(
         "tune=zerolatency",
         "speed-preset=superfast",
         "!",
+        # queue: hand off to the network thread
+        *ENCODED_QUEUE,
+        "!",
         # rtph264pay: packetise H.264 into RTP
         "rtph264pay", "config-interval=1", "pt=96",
         "!",
         # udpsink: send RTP over UDP
         "udpsink", f"host={target_ip}", f"port={target_port}",
+        "sync=false", "async=false",
     ]
 
 
@@ -239,6 +406,12 @@ class CameraManager:
         Stream parameters.
     auto_reconnect : bool
         If *True*, automatically restart the pipeline on failure.
+    prefer_hw_encoder : bool
+        If *True*, use ``v4l2h264enc`` for USB cameras when available.
+    prefer_in_process : bool
+        If *True*, stream the Pi Camera in-process (Picamera2 → ``appsrc``)
+        instead of piping ``rpicam-vid`` into ``gst-launch-1.0``.  Falls
+        back to the subprocess pipeline if picamera2 or PyGObject is missing.
     """
 
     def __init__(
@@ -252,6 +425,8 @@ class CameraManager:
         fps: int = DEFAULT_FPS,
         bitrate: int = DEFAULT_BITRATE,
         auto_reconnect: bool = True,
+        prefer_hw_encoder: bool = True,
+        prefer_in_process: bool = False,
     ) -> None:
         self.target_ip = target_ip
         self.target_port = target_port
@@ -261,6 +436,8 @@ class CameraManager:
         self.fps = fps
         self.bitrate = bitrate
         self.auto_reconnect = auto_reconnect
+        self.prefer_hw_encoder = prefer_hw_encoder
+        self.prefer_in_process = prefer_in_process
 
         # Detect camera if not explicitly provided.
         self.camera_type = camera_type if camera_type is not None else detect_camera_type()
@@ -270,6 +447,20 @@ class CameraManager:
         self._watchdog_thread: Optional[threading.Thread] = None
         self._stop_event = threading.Event()
         self._reconnect_attempts = 0
+        # The watchdog blocks on this selector: it wakes when a child writes
+        # to / closes its stderr, or when stop_stream() pokes the wake pipe.
+        self._selector: Optional[selectors.BaseSelector] = None
+        self._wake_r: Optional[int] = None
+        self._wake_w: Optional[int] = None
+        self._stderr_tail: dict[int, bytes] = {}
+        # Cached pipeline argv lists (see _pipeline_stages).
+        self._stages: list[list[str]] = []
+        self._stages_key: Optional[tuple] = None
+        # In-process Pi Camera pipeline (see _launch_pipeline_picamera2).
+        self._picam2 = None
+        self._gst = None
+        self._gst_pipeline = None
+        self._in_process_failed = False
 
     # ------------------------------------------------------------------
     # Public API
@@ -278,6 +469,8 @@ class CameraManager:
     @property
     def is_streaming(self) -> bool:
         """Return *True* if the pipeline process(es) are alive."""
+        if self._gst_pipeline is not None and not self._in_process_failed:
+            return True
         return any(p.poll() is None for p in self._processes)
 
     def start_stream(self) -> None:
@@ -299,6 +492,10 @@ class CameraManager:
 
         self._stop_event.clear()
         self._reconnect_attempts = 0
+        self._selector = selectors.DefaultSelector()
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ)
         self._launch_pipeline()
 
         # Start a background watchdog that monitors the pipeline health.
@@ -320,12 +517,23 @@ class CameraManager:
     def stop_stream(self) -> None:
         """Gracefully terminate all pipeline processes."""
         self._stop_event.set()
-        self._terminate_processes()
+        if self._wake_w is not None:
+            os.write(self._wake_w, b"\0")
 
         if self._watchdog_thread is not None:
             self._watchdog_thread.join(timeout=5)
             self._watchdog_thread = None
 
+        self._terminate_processes()
+
+        if self._selector is not None:
+            self._selector.close()
+            self._selector = None
+        for fd in (self._wake_r, self._wake_w):
+            if fd is not None:
+                os.close(fd)
+        self._wake_r = self._wake_w = None
+
         logger.info("Stream stopped.")
 
     def restart_stream(self) -> None:
@@ -338,22 +546,59 @@ class CameraManager:
     # Internal helpers
     # ------------------------------------------------------------------
 
+    def _pipeline_stages(self) -> list[list[str]]:
+        """Return the argv list(s) for the current settings.
+
+        Built once and reused across reconnects; rebuilt only if a stream
+        parameter (e.g. ``target_ip`` via the HTTP API) has changed.
+        Executables are resolved to absolute paths up front.
+        """
+        key = (
+            self.camera_type, self.target_ip, self.target_port, self.device,
+            self.width, self.height, self.fps, self.bitrate,
+            self.prefer_hw_encoder,
+        )
+        if self._stages_key != key:
+            if self.camera_type == CameraType.PI_CAMERA:
+                stages = build_picamera_pipeline(
+                    self.target_ip, self.target_port,
+                    self.width, self.height, self.fps,
+                )
+            else:
+                stages = [build_usb_camera_pipeline(
+                    self.target_ip, self.target_port,
+                    self.device, self.width, self.height,
+                    self.fps, self.bitrate,
+                    self.prefer_hw_encoder,
+                )]
+            self._stages = [
+                [shutil.which(argv[0]) or argv[0], *argv[1:]] for argv in stages
+            ]
+            self._stages_key = key
+        return self._stages
+
     def _launch_pipeline(self) -> None:
         """Spawn the correct subprocess(es) for the detected camera type."""
         self._terminate_processes()
 
         if self.camera_type == CameraType.PI_CAMERA:
-            stages = build_picamera_pipeline(
-                self.target_ip, self.target_port,
-                self.width, self.height, self.fps,
-            )
+            if self.prefer_in_process:
+                try:
+                    self._launch_pipeline_picamera2()
+                    return
+                except (ImportError, ValueError, RuntimeError) as exc:
+                    logger.warning(
+                        "In-process Pi Camera pipeline unavailable (%s) – "
+                        "falling back to rpicam-vid.", exc,
+                    )
+            stages = self._pipeline_stages()
             # Pipe libcamera-vid stdout into gst-launch-1.0 stdin.
-            libcamera_proc = subprocess.Popen(
+            libcamera_proc = _spawn(
                 stages[0],
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
             )
-            gst_proc = subprocess.Popen(
+            gst_proc = _spawn(
                 stages[1],
                 stdin=libcamera_proc.stdout,
                 stderr=subprocess.PIPE,
@@ -362,21 +607,144 @@ class CameraManager:
             if libcamera_proc.stdout is not None:
                 libcamera_proc.stdout.close()
             self._processes = [libcamera_proc, gst_proc]
+            self._watch_stderr()
 
         elif self.camera_type == CameraType.USB_CAMERA:
-            cmd = build_usb_camera_pipeline(
-                self.target_ip, self.target_port,
-                self.device, self.width, self.height,
-                self.fps, self.bitrate,
-            )
-            proc = subprocess.Popen(cmd, stderr=subprocess.PIPE)
+            proc = _spawn(self._pipeline_stages()[0], stderr=subprocess.PIPE)
             self._processes = [proc]
+            self._watch_stderr()
 
         else:
             raise RuntimeError(f"Unsupported camera type: {self.camera_type}")
 
+    def _launch_pipeline_picamera2(self) -> None:
+        """Stream the Pi Camera in-process: Picamera2 H.264 → appsrc → RTP/UDP.
+
+        Removes the ``rpicam-vid`` subprocess and the Unix-pipe copy between
+        it and ``gst-launch-1.0``.  Pipeline errors are reported through the
+        GStreamer bus and wake the watchdog like a crashed subprocess would.
+
+        Raises
+        ------
+        ImportError, ValueError
+            If picamera2 or the GStreamer GObject bindings are unavailable.
+        RuntimeError
+            If the camera cannot be opened or the pipeline fails to start.
+        """
+        from picamera2 import Picamera2
+        from picamera2.encoders import H264Encoder
+        from picamera2.outputs import Output
+        import gi
+        gi.require_version("Gst", "1.0")
+        from gi.repository import Gst
+
+        Gst.init(None)
+        pipeline = Gst.parse_launch(
+            build_appsrc_pipeline(self.target_ip, self.target_port)
+        )
+        appsrc = pipeline.get_by_name("src")
+
+        class _AppSrcOutput(Output):
+            # Picamera2 recycles the encoder buffer once this returns, so the
+            # access unit is copied once into the GstBuffer.
+            def outputframe(self, frame, keyframe=True, timestamp=None, *args, **kwargs):
+                appsrc.emit("push-buffer", Gst.Buffer.new_wrapped(bytes(frame)))
+
+        def _on_message(_bus, message) -> None:
+            if message.type == Gst.MessageType.ERROR:
+                err, _debug = message.parse_error()
+                logger.error("In-process pipeline error: %s", err.message)
+            elif message.type != Gst.MessageType.EOS:
+                return
+            self._in_process_failed = True
+            if self._wake_w is not None:
+                os.write(self._wake_w, b"\0")
+
+        bus = pipeline.get_bus()
+        bus.enable_sync_message_emission()
+        bus.connect("sync-message", _on_message)
+
+        # Reset before starting so a bus error raised during startup sticks.
+        self._in_process_failed = False
+        picam = None
+        try:
+            picam = Picamera2()
+            picam.configure(picam.create_video_configuration(
+                main={"size": (self.width, self.height)},
+                controls={"FrameRate": self.fps},
+            ))
+            encoder = H264Encoder(bitrate=self.bitrate * 1000, repeat=True, iperiod=self.fps)
+            if pipeline.set_state(Gst.State.PLAYING) == Gst.StateChangeReturn.FAILURE:
+                raise RuntimeError("GStreamer pipeline failed to start")
+            picam.start_recording(encoder, _AppSrcOutput())
+        except Exception:
+            # Nothing is published yet, so is_streaming stays False; release
+            # whatever did start before re-raising.
+            if picam is not None:
+                try:
+                    picam.stop_recording()
+                except Exception:
+                    pass
+                try:
+                    picam.close()
+                except Exception:
+                    pass
+            pipeline.set_state(Gst.State.NULL)
+            raise
+
+        self._gst = Gst
+        self._gst_pipeline = pipeline
+        self._picam2 = picam
+
+    def _stop_in_process(self) -> None:
+        """Tear down the in-process Pi Camera pipeline, if running."""
+        if self._picam2 is not None:
+            try:
+                self._picam2.stop_recording()
+                self._picam2.close()
+            except Exception as exc:
+                logger.debug("Picamera2 shutdown failed: %s", exc)
+            self._picam2 = None
+        if self._gst_pipeline is not None:
+            self._gst_pipeline.set_state(self._gst.State.NULL)
+            self._gst_pipeline = None
+
+    def _watch_stderr(self) -> None:
+        """Register each pipeline process's stderr with the watchdog selector."""
+        self._stderr_tail.clear()
+        if self._selector is None:
+            return
+        for proc in self._processes:
+            if proc.stderr is not None:
+                os.set_blocking(proc.stderr.fileno(), False)
+                self._selector.register(proc.stderr, selectors.EVENT_READ, proc)
+
+    def _drain_stderr(self, key: selectors.SelectorKey) -> None:
+        """Read what is available from a child's stderr into its ring buffer.
+
+        On EOF the child has exited: unregister the pipe and reap the process.
+        """
+        proc: subprocess.Popen = key.data
+        try:
+            chunk = os.read(key.fd, 4096)
+        except BlockingIOError:
+            return
+        except OSError:
+            chunk = b""
+        if chunk:
+            tail = self._stderr_tail.get(proc.pid, b"") + chunk
+            self._stderr_tail[proc.pid] = tail[-STDERR_TAIL_BYTES:]
+            return
+        if self._selector is not None:
+            self._selector.unregister(key.fileobj)
+        try:
+            proc.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            pass
+
     def _terminate_processes(self) -> None:
         """Send SIGINT then SIGKILL to any running pipeline processes."""
+        self._stop_in_process()
         for proc in self._processes:
             if proc.poll() is None:
                 try:
@@ -386,29 +754,45 @@ class CameraManager:
                 except (subprocess.TimeoutExpired, OSError):
                     proc.kill()
                     proc.wait(timeout=2)
+            if proc.stderr is not None:
+                if self._selector is not None:
+                    try:
+                        self._selector.unregister(proc.stderr)
+                    except (KeyError, ValueError):
+                        pass
+                proc.stderr.close()
         self._processes.clear()
 
     def _watchdog(self) -> None:
-        """Background thread that monitors pipeline health and reconnects."""
-        while not self._stop_event.is_set():
-            time.sleep(1.0)
+        """Background thread that monitors pipeline health and reconnects.
 
-            if self._stop_event.is_set():
+        Blocks on the selector rather than polling, so a crashed pipeline is
+        noticed the moment its stderr closes.
+        """
+        while not self._stop_event.is_set():
+            if self._selector is None:
                 break
+            if self.is_streaming:
+                for key, _ in self._selector.select(timeout=None):
+                    if key.data is not None:
+                        self._drain_stderr(key)
+                    else:
+                        try:
+                            os.read(key.fd, 64)  # consume the wake-up byte(s)
+                        except BlockingIOError:
+                            pass
+
+                if self._stop_event.is_set():
+                    break
 
             if not self.is_streaming:
-                # Collect stderr from crashed processes for diagnostics.
+                # Report the tail of stderr from the crashed processes.
                 for proc in self._processes:
-                    stderr_data = b""
-                    if proc.stderr is not None:
-                        try:
-                            stderr_data = proc.stderr.read() or b""
-                        except Exception:
-                            pass
+                    stderr_data = self._stderr_tail.get(proc.pid, b"")
                     rc = proc.returncode
                     logger.error(
                         "Pipeline process (PID %d) exited with code %s. stderr: %s",
-                        proc.pid, rc, stderr_data.decode(errors="replace")[:500],
+                        proc.pid, rc, stderr_data.decode(errors="replace")[-500:],
                     )
 
                 if not self.auto_reconnect:
@@ -428,7 +812,8 @@ class CameraManager:
                     self._reconnect_attempts, MAX_RECONNECT_ATTEMPTS,
                     RECONNECT_DELAY,
                 )
-                time.sleep(RECONNECT_DELAY)
+                if self._stop_event.wait(RECONNECT_DELAY):
+                    break
                 try:
                     self._launch_pipeline()
                 except Exception as exc:
@@ -450,9 +835,9 @@ class CameraManager:
     # ------------------------------------------------------------------
 
     @staticmethod
-    def list_video_devices() -> list[str]:
-        """Return available ``/dev/videoN`` paths."""
-        return _find_video_devices()
+    def list_video_devices(refresh: bool = False) -> list[str]:
+        """Return available ``/dev/videoN`` paths (cached unless *refresh*)."""
+        return _find_video_devices(refresh)
 
     @staticmethod
     def check_gstreamer() -> bool:
@@ -491,6 +876,14 @@ def _cli() -> None:
         "--camera", choices=["pi", "usb", "auto"], default="auto",
         help="Force camera backend",
     )
+    parser.add_argument(
+        "--sw-encoder", action="store_true",
+        help="Use x264enc even if v4l2h264enc is available",
+    )
+    parser.add_argument(
+        "--in-process", action="store_true",
+        help="Stream the Pi Camera via Picamera2 + appsrc instead of rpicam-vid",
+    )
     args = parser.parse_args()
 
     cam_type: Optional[CameraType] = None
@@ -506,6 +899,8 @@ def _cli() -> None:
         width=args.width,
         height=args.height,
         fps=args.fps,
+        prefer_hw_encoder=not args.sw_encoder,
+        prefer_in_process=args.in_process,
     )
 
     print("Detected devices:", cam.list_video_devices())
@@ -1,8 +1,23 @@
-from picamera2 import Picamera2
+import numpy as np
+from picamera2 import MappedArray, Picamera2
 
 picam = Picamera2()
-picam.configure(picam.create_video_configuration(main={"size": (320, 240)}))
+# "RGB888" is B, G, R in memory - OpenCV's native 3-channel order, so frames
+# need no colour conversion (the default XBGR8888 carries a 4th byte)
+picam.configure(picam.create_video_configuration(main={"size": (320, 240), "format": "RGB888"}))
 picam.start()
 
-def capture_frame():
-    return picam.capture_array()
+def capture_frame(out=None):
+    # With out=None a new array is returned; pass a preallocated (240, 320, 3)
+    # uint8 array to have the frame copied straight from the DMA buffer into it
+    if out is None:
+        return picam.capture_array()
+    if out.shape != (240, 320, 3) or out.dtype != np.uint8:
+        raise ValueError(f"out must be a (240, 320, 3) uint8 array, got {out.shape} {out.dtype}")
+    request = picam.capture_request()
+    try:
+        with MappedArray(request, "main") as mapped:
+            np.copyto(out, mapped.array)
+    finally:
+        request.release()
+    return out
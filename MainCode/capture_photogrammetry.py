@@ -1,7 +1,11 @@
 #!/usr/bin/env python3
 """Capture a fixed number of images using rpicam-still."""
 
+from __future__ import annotations
+
+import glob
 import os
+import re
 import subprocess
 import time
 
@@ -11,35 +15,61 @@ INTERVAL_SECONDS = 3
 OUTPUT_DIR = "captures"
 
 
-def countdown(seconds: int) -> None:
-    if seconds <= 0:
-        return
-    print(f"Next photo in {seconds}...", end="", flush=True)
-    for remaining in range(seconds - 1, -1, -1):
-        time.sleep(1)
-        if remaining > 0:
-            print(f"{remaining}...", end="", flush=True)
-    print()
+def frame_indices() -> list[int]:
+    """Return the indices of the frame_NNNN.jpg files in OUTPUT_DIR."""
+    indices = []
+    for path in glob.glob(os.path.join(OUTPUT_DIR, "frame_*.jpg")):
+        match = re.fullmatch(r"frame_(\d+)\.jpg", os.path.basename(path))
+        if match:
+            indices.append(int(match.group(1)))
+    return indices
+
+
+def saved_count(first_index: int) -> int:
+    return sum(1 for index in frame_indices() if index >= first_index)
 
 
 def main() -> None:
     os.makedirs(OUTPUT_DIR, exist_ok=True)
+    # Number on from the last frame already on disk so earlier runs are kept.
+    first_index = max(frame_indices(), default=0) + 1
+
+    # One long-lived rpicam-still in timelapse mode: the camera is opened and
+    # configured once instead of once per image.
+    interval_ms = INTERVAL_SECONDS * 1000
+    try:
+        proc = subprocess.Popen([
+            "rpicam-still", "-n",
+            "-t", str(TOTAL_IMAGES * interval_ms),
+            "--timelapse", str(interval_ms),
+            "--framestart", str(first_index),
+            "-o", os.path.join(OUTPUT_DIR, "frame_%04d.jpg"),
+        ])
+    except OSError as exc:
+        print(f"Capture failed: {exc}")
+        return
+
+    # Report progress on a fixed monotonic schedule so it doesn't drift.
+    start = time.monotonic()
+    interrupted = False
+    try:
+        for index in range(1, TOTAL_IMAGES + 1):
+            deadline = start + INTERVAL_SECONDS * index
+            time.sleep(max(0.0, deadline - time.monotonic()))
+            if proc.poll() is not None:
+                break
+            print(f"Saved {saved_count(first_index)}/{TOTAL_IMAGES}")
+        proc.wait()
+    except KeyboardInterrupt:
+        interrupted = True
+        proc.terminate()
+        proc.wait()
 
-    for index in range(1, TOTAL_IMAGES + 1):
-        countdown(INTERVAL_SECONDS)
-        filename = f"frame_{index:04d}.jpg"
-        filepath = os.path.join(OUTPUT_DIR, filename)
-
-        try:
-            subprocess.run(
-                ["rpicam-still", "-o", filepath],
-                check=True,
-            )
-        except subprocess.CalledProcessError as exc:
-            print(f"Capture failed for {filename}: {exc}")
-            return
-
-        print(f"Saved {filename} ({index}/{TOTAL_IMAGES})")
+    if interrupted:
+        print("Capture stopped")
+    elif proc.returncode not in (0, None):
+        print(f"Capture failed: rpicam-still exited with code {proc.returncode}")
+    print(f"Done: {saved_count(first_index)} image(s) in {OUTPUT_DIR}/")
 
 
 if __name__ == "__main__":
@@ -11,7 +11,12 @@ import time
 import os
 import numpy as np
 import smbus2
-import RPi.GPIO as GPIO
+
+try:
+    from MainCode.hw import gpio, i2c, ultrasonic
+except ImportError:
+    # Run directly as a script from MainCode/.
+    from hw import gpio, i2c, ultrasonic
 
 # Lazy imports for Flask & OpenCV
 
@@ -30,84 +35,181 @@ class FrameGrabber:
         self._cap = self.cv2.VideoCapture(device)
         self._cap.set(self.cv2.CAP_PROP_FRAME_WIDTH, width)
         self._cap.set(self.cv2.CAP_PROP_FRAME_HEIGHT, height)
+        # Keep only the newest frame in the V4L2 queue
+        self._cap.set(self.cv2.CAP_PROP_BUFFERSIZE, 1)
+        # Ask the camera for MJPEG so the JPEG is produced by the device, and
+        # have OpenCV hand back the compressed buffer instead of decoding it.
+        mjpg = self.cv2.VideoWriter_fourcc(*"MJPG")
+        self._cap.set(self.cv2.CAP_PROP_FOURCC, mjpg)
+        self._passthrough = (
+            int(self._cap.get(self.cv2.CAP_PROP_FOURCC)) == mjpg
+            and self._cap.set(self.cv2.CAP_PROP_CONVERT_RGB, 0)
+        )
         self.frame = None
+        self._last_raw = None
+        self._raw_seq = 0
         self._lock = threading.Lock()
+        # Capture thread notifies the encode thread when a new raw frame lands
+        self._raw_ready = threading.Condition(self._lock)
+        # Encoder notifies MJPEG clients when a new JPEG is published
+        self._frame_ready = threading.Condition(self._lock)
+        self._seq = 0
         self._running = False
         self._thread = None
+        self._encode_thread = None
 
     def start(self) -> None:
         if self._running:
             return
         self._running = True
         self._thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self._encode_thread = threading.Thread(target=self._encode_loop, daemon=True)
         self._thread.start()
+        self._encode_thread.start()
 
     def stop(self) -> None:
         self._running = False
-        if self._thread:
-            self._thread.join(timeout=5)
+        with self._lock:
+            self._raw_ready.notify_all()
+            self._frame_ready.notify_all()
+        for thread in (self._thread, self._encode_thread):
+            if thread:
+                thread.join(timeout=5)
         if self._cap and self._cap.isOpened():
             self._cap.release()
 
     def _capture_loop(self) -> None:
+        # Capture only: grab/retrieve blocks at the sensor's frame rate, and
+        # with encoding on its own thread nothing queues up in V4L2.
         while self._running:
-            ok, raw = self._cap.read()
-            if not ok:
+            if not self._cap.grab():
                 time.sleep(0.05)
                 continue
+            ok, raw = self._cap.retrieve()
+            if not ok:
+                continue
+            if self._passthrough:
+                data = raw.tobytes()
+                if data[:2] == b"\xff\xd8":
+                    self._publish_frame(data)
+                    continue
+                # Backend decoded the frame anyway - encode in software
+                self._passthrough = False
+                self._cap.set(self.cv2.CAP_PROP_CONVERT_RGB, 1)
+                continue
+            with self._raw_ready:
+                self._last_raw = raw
+                self._raw_seq += 1
+                self._raw_ready.notify()
+
+    def _encode_loop(self) -> None:
+        last_seq = 0
+        while self._running:
+            with self._raw_ready:
+                self._raw_ready.wait_for(
+                    lambda: self._raw_seq != last_seq or not self._running
+                )
+                raw = self._last_raw
+                last_seq = self._raw_seq
+            if raw is None:
+                continue
             _, buf = self.cv2.imencode(".jpg", raw, [self.cv2.IMWRITE_JPEG_QUALITY, 70])
-            with self._lock:
-                self.frame = buf.tobytes()
-            time.sleep(0.033)
+            self._publish_frame(buf.tobytes())
+
+    def _publish_frame(self, frame: bytes) -> None:
+        with self._lock:
+            self.frame = frame
+            self._seq += 1
+            self._frame_ready.notify_all()
 
     def get_latest_frame(self):
         with self._lock:
             return self.frame
 
+    def get_latest_raw(self):
+        with self._lock:
+            raw, frame = self._last_raw, self.frame
+        if raw is None and frame is not None:
+            # MJPEG passthrough keeps no BGR frame; decode only on demand
+            raw = self.cv2.imdecode(np.frombuffer(frame, np.uint8), self.cv2.IMREAD_COLOR)
+        return raw
+
     def generate_mjpeg(self):
+        # Wake once per published frame; each client sees every frame once
+        last_seq = 0
         while self._running:
-            frame = self.get_latest_frame()
+            with self._frame_ready:
+                self._frame_ready.wait_for(
+                    lambda: self._seq != last_seq or not self._running
+                )
+                frame = self.frame
+                last_seq = self._seq
             if frame is None:
-                time.sleep(0.05)
                 continue
             yield (
                 b"--frame\r\n"
                 b"Content-Type: image/jpeg\r\n\r\n" + frame + b"\r\n"
             )
-            time.sleep(0.033)
+
+# One FrameGrabber per camera, each with its own threads and lock, so
+# producers never contend and consumers always get each camera's newest frame
+class MultiFrameGrabber:
+    def __init__(self, devices=(0,), width: int = 1280, height: int = 720) -> None:
+        self._grabbers = {
+            device: FrameGrabber(device=device, width=width, height=height)
+            for device in devices
+        }
+
+    def __getitem__(self, device_idx: int) -> FrameGrabber:
+        return self._grabbers[device_idx]
+
+    def __contains__(self, device_idx: int) -> bool:
+        return device_idx in self._grabbers
+
+    def start(self) -> None:
+        for g in self._grabbers.values():
+            g.start()
+
+    def stop(self) -> None:
+        for g in self._grabbers.values():
+            g.stop()
+
+    def get_latest(self, device_idx: int):
+        return self._grabbers[device_idx].get_latest_frame()
+
+    def get_latest_raw(self, device_idx: int):
+        return self._grabbers[device_idx].get_latest_raw()
 
 # Sensor setup
 PCF8591_ADDRESS = 0x48
 HALL_CHANNEL = 0
 MAGNET_THRESHOLD = 100
-bus = smbus2.SMBus(1)
+
+class PCF8591:
+    def __init__(self, bus=None, address: int = PCF8591_ADDRESS) -> None:
+        # Pass a bus to reuse an open handle (or a mock in tests)
+        self.bus = bus if bus is not None else i2c()
+        self.address = address
+
+    def read(self, channel: int) -> int:
+        # Control byte + two reads in one transaction (repeated START);
+        # the first byte is the previous conversion, the second is ours
+        write = smbus2.i2c_msg.write(self.address, [channel])
+        read = smbus2.i2c_msg.read(self.address, 2)
+        self.bus.i2c_rdwr(write, read)
+        return list(read)[1]
+
+adc = PCF8591()
 
 def read_analog(channel):
-    control_byte = channel
-    bus.write_byte(PCF8591_ADDRESS, control_byte)
-    bus.read_byte(PCF8591_ADDRESS)
-    value = bus.read_byte(PCF8591_ADDRESS)
-    return value
+    return adc.read(channel)
 
 TRIG = 23
 ECHO = 24
-GPIO.setmode(GPIO.BCM)
-GPIO.setup(TRIG, GPIO.OUT)
-GPIO.setup(ECHO, GPIO.IN)
+ranger = ultrasonic(TRIG, ECHO)
 
 def get_distance():
-    GPIO.output(TRIG, True)
-    time.sleep(0.00001)
-    GPIO.output(TRIG, False)
-    start = time.time()
-    end = time.time()
-    while GPIO.input(ECHO) == 0:
-        start = time.time()
-    while GPIO.input(ECHO) == 1:
-        end = time.time()
-    duration = end - start
-    distance = duration * 17150
-    return distance / 100.0
+    return ranger.distance()
 
 OUTPUT_DIR = "captures"
 image_counter = 0
@@ -117,13 +219,20 @@ if not os.path.exists(OUTPUT_DIR):
 # Flask app factory
 Flask, Response, jsonify, request = _import_flask()
 app = Flask(__name__)
-grabber = FrameGrabber(device=0, width=640, height=480)
-grabber.start()
+grabbers = MultiFrameGrabber(devices=[0], width=640, height=480)
+grabbers.start()
+grabber = grabbers[0]
 
 @app.route("/video")
 def video_feed():
     return Response(grabber.generate_mjpeg(), mimetype="multipart/x-mixed-replace; boundary=frame")
 
+@app.route("/video/<int:device>")
+def video_feed_device(device):
+    if device not in grabbers:
+        return jsonify({"error": f"no camera {device}"}), 404
+    return Response(grabbers[device].generate_mjpeg(), mimetype="multipart/x-mixed-replace; boundary=frame")
+
 @app.route("/health")
 def health():
     return jsonify({"status": "ok"})
@@ -145,11 +254,10 @@ def sensor_loop():
             if current_time - last_capture_time >= 5:
                 frame_bytes = grabber.get_latest_frame()
                 if frame_bytes is not None:
-                    np_arr = _import_cv2().imdecode(
-                        np.frombuffer(frame_bytes, np.uint8), _import_cv2().IMREAD_COLOR
-                    )
+                    # Already a valid JPEG - write it as-is, no decode/re-encode
                     filename = f"{OUTPUT_DIR}/frame_{image_counter:04d}.jpg"
-                    _import_cv2().imwrite(filename, np_arr)
+                    with open(filename, "wb") as f:
+                        f.write(frame_bytes)
                     print(f"Captured: {filename} | Distance: {distance:.2f}m")
                     image_counter += 1
                     last_capture_time = current_time
@@ -162,5 +270,5 @@ if __name__ == "__main__":
     sensor_thread = threading.Thread(target=sensor_loop, daemon=True)
     sensor_thread.start()
     app.run(host="0.0.0.0", port=8080, use_reloader=False, threaded=True)
-    grabber.stop()
-    GPIO.cleanup()
+    grabbers.stop()
+    gpio().cleanup()
@@ -1,30 +1,60 @@
 # dune detection module
 from __future__ import annotations
 
+import asyncio
 import logging
+import math
+import queue
+import threading
 from dataclasses import dataclass
 from typing import Any, Optional
 
 logger = logging.getLogger(__name__)
 
+try:
+    import cv2
+except Exception:
+    cv2 = None
+
+try:
+    from numba import njit
+except Exception:
+    njit = None
+
+# capability flags, probed once here so the detection loop skips absent
+# devices instead of raising and catching ImportError every iteration
 try:
     from MainCode.ultrasonic import get_distance
+    _has_ultrasonic = True
 except Exception:
+    _has_ultrasonic = False
+
     def get_distance() -> float:  # ignore
         raise ImportError("ultrasonic.get_distance not available")
 
 try:
     from MainCode.ir_sensor import is_obstacle
+    _has_ir = True
 except Exception:
+    _has_ir = False
+
     def is_obstacle() -> bool:  # ignore
         raise ImportError("ir_sensor.is_obstacle not available")
 
 try:
     from MainCode.camera_module import capture_frame
+    _has_camera = True
 except Exception:
-    def capture_frame() -> Any:  # ignore
+    _has_camera = False
+
+    def capture_frame(out: Any = None) -> Any:  # ignore
         raise ImportError("camera_module.capture_frame not available")
 
+logger.debug(
+    "sensors available: ultrasonic=%s ir=%s camera=%s",
+    _has_ultrasonic, _has_ir, _has_camera,
+)
+
 
 @dataclass
 class DetectionResult:
@@ -38,6 +68,67 @@ def _clamp01(x: float) -> float:
     return max(0.0, min(1.0, x))
 
 
+if njit is not None:
+    @njit(cache=True)
+    def _luma_sums(arr):  # pragma: no cover - needs numba
+        # one fused pass: BT.601 luma (BGR order) plus sum / sum of squares
+        s = 0
+        ss = 0
+        for i in range(arr.shape[0]):
+            for j in range(arr.shape[1]):
+                g = (29 * arr[i, j, 0] + 150 * arr[i, j, 1] + 77 * arr[i, j, 2]) >> 8
+                s += g
+                ss += g * g
+        return s, ss
+else:
+    _luma_sums = None
+
+
+def _gray_stats(arr: Any) -> tuple[float, float]:
+    # mean / std of the luminance plane
+    if cv2 is not None and arr.dtype == "uint8" and (
+        arr.ndim == 2 or (arr.ndim == 3 and arr.shape[2] in (3, 4))
+    ):
+        # single SIMD pass, no float64 temporaries
+        if arr.ndim == 3:
+            code = cv2.COLOR_BGR2GRAY if arr.shape[2] == 3 else cv2.COLOR_BGRA2GRAY
+            gray = cv2.cvtColor(arr, code)
+        else:
+            gray = arr
+        m, s = cv2.meanStdDev(gray)
+        return float(m[0, 0]), float(s[0, 0])
+
+    if _luma_sums is not None and arr.dtype == "uint8" and arr.ndim == 3 and arr.shape[2] >= 3:
+        # jitted kernel: no temporaries at all
+        n = arr.shape[0] * arr.shape[1]
+        total, sumsq = _luma_sums(arr)
+        mean = total / n
+        return mean, math.sqrt(max(0.0, sumsq / n - mean * mean))
+
+    if arr.dtype == "uint8" and arr.ndim in (2, 3):
+        # integer accumulators: no float64 temporaries
+        import numpy as np
+
+        if arr.ndim == 3:
+            # BT.601 luma in 8.8 fixed point (BGR order, matches cvtColor);
+            # max 255 * 256 fits uint16
+            gray = arr[..., 0].astype(np.uint16) * 29
+            gray += arr[..., 1].astype(np.uint16) * 150
+            gray += arr[..., 2].astype(np.uint16) * 77
+            gray >>= 8
+        else:
+            gray = arr
+        flat = gray.ravel()
+        n = flat.size
+        total = int(np.add.reduce(flat, dtype=np.int64))
+        sumsq = int(np.add.reduce(flat.astype(np.uint32) ** 2, dtype=np.int64))
+        mean = total / n
+        return mean, math.sqrt(max(0.0, sumsq / n - mean * mean))
+
+    gray = arr.mean(axis=2) if arr.ndim == 3 else arr
+    return float(gray.mean()), float(gray.std())
+
+
 def analyze_frame(frame: Any) -> float:
     # return camera confidence 0..1
     try:
@@ -56,57 +147,167 @@ def analyze_frame(frame: Any) -> float:
     if arr.size == 0:
         return 0.0
 
-    # convert to grayscale proxy
-    if arr.ndim == 3:
-        gray = arr.mean(axis=2)
-    else:
-        gray = arr
+    # mean/std don't need full resolution: a 4x4-strided view touches 1/16
+    # of the pixels
+    if arr.ndim >= 2 and arr.shape[0] > 120:
+        arr = arr[::4, ::4]
 
-    mean = float(gray.mean())
+    mean, std = _gray_stats(arr)
     # map mean (0..255) to 0..1
     confidence = mean / 255.0
 
     # texture proxy
-    std = float(gray.std())
     texture_factor = 1.0 - _clamp01(std / 64.0)
 
     return _clamp01(0.6 * confidence + 0.4 * texture_factor)
 
 
-def detect_dune(distance_threshold: float = 1.0, use_camera: bool = True) -> DetectionResult:
-        # combine sensors into a detection result
-    distance = float("inf")
-    obstacle = False
-    frame = None
-    camera_conf = 0.0
-
-    # read ultrasonic
+def _read_distance() -> float:
+    if not _has_ultrasonic:
+        return float("inf")
     try:
-        distance = float(get_distance())
+        return float(get_distance())
     except Exception as exc:  # pragma: no cover - hardware dependent
         logger.debug("ultrasonic read failed: %s", exc)
+        return float("inf")
+
 
-    # read ir
+def _read_obstacle() -> bool:
+    if not _has_ir:
+        return False
     try:
-        obstacle = bool(is_obstacle())
+        return bool(is_obstacle())
     except Exception as exc:  # pragma: no cover
         logger.debug("ir sensor read failed: %s", exc)
+        return False
+
+
+# Optional background capture: a producer thread keeps the freshest frame in
+# a 1-slot queue so capture overlaps analysis and the rest of the loop
+_latest_frame: "queue.Queue[Any]" = queue.Queue(maxsize=1)
+_capture_stop = threading.Event()
+_capture_thread: Optional[threading.Thread] = None
 
-    # read camera
-    if use_camera:
+
+def _capture_loop() -> None:
+    # A frame replaced before any reader took it was never handed out, so its
+    # array is reused as the next capture buffer instead of allocating anew
+    spare = None
+    while not _capture_stop.is_set():
         try:
-            frame = capture_frame()
-            camera_conf = analyze_frame(frame)
+            frame = capture_frame(out=spare)
         except Exception as exc:  # pragma: no cover
-            logger.debug("camera capture/analyze failed: %s", exc)
+            logger.debug("background capture failed: %s", exc)
+            _capture_stop.wait(0.5)
+            continue
+        # replace any unconsumed frame so readers always get the newest
+        try:
+            spare = _latest_frame.get_nowait()
+        except queue.Empty:
+            spare = None
+        try:
+            _latest_frame.put_nowait(frame)
+        except queue.Full:
+            pass
 
-    # combine heuristics
-    conf = camera_conf * 0.7
+
+def start_background_capture() -> None:
+    """Capture frames continuously in a daemon thread for detect_dune."""
+    global _capture_thread
+    if not _has_camera:
+        return
+    if _capture_thread is not None and _capture_thread.is_alive():
+        return
+    _capture_stop.clear()
+    _capture_thread = threading.Thread(target=_capture_loop, daemon=True)
+    _capture_thread.start()
+
+
+def stop_background_capture() -> None:
+    global _capture_thread
+    _capture_stop.set()
+    if _capture_thread is not None:
+        _capture_thread.join(timeout=2)
+        _capture_thread = None
+
+
+def _capture(timeout: float = 1.0) -> Any:
+    # newest frame from the background thread if running, else capture now
+    if not _has_camera:
+        return None
+    if _capture_thread is not None and _capture_thread.is_alive():
+        try:
+            return _latest_frame.get(timeout=timeout)
+        except queue.Empty:
+            logger.debug("no frame from background capture within %.1fs", timeout)
+            return None
+    try:
+        return capture_frame()
+    except Exception as exc:  # pragma: no cover
+        logger.debug("camera capture failed: %s", exc)
+        return None
+
+
+def _sensor_base(distance: float, obstacle: bool, distance_threshold: float) -> float:
+    base = 0.0
     if distance < distance_threshold:
-        conf += 0.25
+        base += 0.25
     if obstacle:
-        conf += 0.15
+        base += 0.15
+    return base
 
-    conf = _clamp01(conf)
+
+def _result(distance: float, obstacle: bool, base: float, frame: Any) -> DetectionResult:
+    camera_conf = 0.0
+    if frame is not None:
+        try:
+            camera_conf = analyze_frame(frame)
+        except Exception as exc:  # pragma: no cover
+            logger.debug("camera analyze failed: %s", exc)
+
+    # combine heuristics
+    conf = _clamp01(camera_conf * 0.7 + base)
 
     return DetectionResult(distance=distance, obstacle=obstacle, dune_confidence=conf, frame=frame)
+
+
+def detect_dune(
+    distance_threshold: float = 1.0,
+    use_camera: bool = True,
+    early_exit_threshold: Optional[float] = None,
+) -> DetectionResult:
+        # combine sensors into a detection result
+    # early_exit_threshold: skip the camera (the expensive part) when
+    # ultrasonic + ir alone already contribute at least this much
+    distance = _read_distance()
+    obstacle = _read_obstacle()
+    base = _sensor_base(distance, obstacle, distance_threshold)
+
+    frame = None
+    if use_camera and (early_exit_threshold is None or base < early_exit_threshold):
+        frame = _capture()
+
+    return _result(distance, obstacle, base, frame)
+
+
+async def detect_dune_async(
+    distance_threshold: float = 1.0,
+    use_camera: bool = True,
+    early_exit_threshold: Optional[float] = None,
+) -> DetectionResult:
+    # same as detect_dune, but the blocking device reads run concurrently in
+    # worker threads: latency is the slowest sensor, not the sum
+    reads = [asyncio.to_thread(_read_distance), asyncio.to_thread(_read_obstacle)]
+    # with an early-exit threshold the camera has to wait for the verdict
+    capture_now = use_camera and early_exit_threshold is None
+    if capture_now:
+        reads.append(asyncio.to_thread(_capture))
+    distance, obstacle, *rest = await asyncio.gather(*reads)
+    base = _sensor_base(distance, obstacle, distance_threshold)
+
+    frame = rest[0] if capture_now else None
+    if use_camera and not capture_now and base < early_exit_threshold:
+        frame = await asyncio.to_thread(_capture)
+
+    # analyze_frame is CPU-bound and short; run it inline
+    return _result(distance, obstacle, base, frame)
@@ -12,19 +12,98 @@ Or import individual checks in other modules::
 """
 from __future__ import annotations
 
+import functools
 import logging
 import os
 import shutil
+import stat
 import subprocess
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
 logger = logging.getLogger("falconia.gstreamer_debug")
 
+
+@functools.lru_cache(maxsize=None)
+def _which(name: str) -> Optional[str]:
+    """``shutil.which`` memoised for the life of the process."""
+    return shutil.which(name)
+
+def _run(
+    cmd: list[str],
+    timeout: float,
+    *,
+    stderr: int = subprocess.PIPE,
+    env: Optional[dict[str, str]] = None,
+) -> tuple[int, bytes, bytes]:
+    """Run *cmd* and return ``(returncode, stdout, stderr)``.
+
+    On timeout the child is killed and reaped before ``TimeoutExpired`` is
+    re-raised (with whatever output was captured), so a hung tool never
+    outlives the diagnostic.
+    """
+    proc = subprocess.Popen(
+        cmd,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=stderr,
+        env=env,
+    )
+    try:
+        out, err = proc.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired as exc:
+        proc.kill()
+        exc.output, exc.stderr = proc.communicate()
+        raise
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+    return proc.returncode, out, err or b""
+
+
 # ---------------------------------------------------------------------------
 # Device inspection
 # ---------------------------------------------------------------------------
 
+# Last list_video_devices() result, keyed by _devices_checksum().
+_DEV_CACHE: dict[str, object] = {}
+
+
+def _scan_video_nodes() -> list[tuple[str, os.stat_result]]:
+    """Return ``(path, stat)`` for each ``/dev/video*`` character device.
+
+    Uses ``os.scandir`` so each node costs a single ``stat``, sorted by name.
+    """
+    nodes: list[tuple[str, os.stat_result]] = []
+    try:
+        with os.scandir("/dev") as it:
+            for entry in it:
+                if not entry.name.startswith("video"):
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                if stat.S_ISCHR(st.st_mode):
+                    nodes.append((entry.path, st))
+    except OSError:
+        return []
+    nodes.sort(key=lambda node: node[0])
+    return nodes
+
+
+def _devices_checksum(nodes: list[tuple[str, os.stat_result]]) -> int:
+    """Cheap fingerprint of a ``_scan_video_nodes()`` result.
+
+    Changes when a device node is added, removed, or re-created.
+    """
+    checksum = 0
+    for path, st in nodes:
+        checksum ^= hash((path, st.st_rdev, st.st_mtime_ns))
+    return checksum
+
+
 def list_video_devices() -> list[dict[str, str]]:
     """Return metadata for each ``/dev/videoN`` device.
 
@@ -32,23 +111,25 @@ def list_video_devices() -> list[dict[str, str]]:
         - ``path``:  e.g. ``/dev/video0``
         - ``name``:  human-readable device name (from ``v4l2-ctl``) or ``"unknown"``
         - ``driver``: kernel driver name or ``"unknown"``
+
+    ``v4l2-ctl`` is only re-run when the set of device nodes changes;
+    otherwise the previous result is returned.
     """
-    dev = Path("/dev")
+    nodes = _scan_video_nodes()
+    key = _devices_checksum(nodes)
+    if _DEV_CACHE.get("key") == key:
+        return [dict(d) for d in _DEV_CACHE["devices"]]
+
     devices: list[dict[str, str]] = []
 
-    for devpath in sorted(dev.glob("video*")):
-        if not devpath.is_char_device():
-            continue
+    for devpath, _ in nodes:
         info: dict[str, str] = {"path": str(devpath), "name": "unknown", "driver": "unknown"}
 
         # Try v4l2-ctl for richer metadata
-        if shutil.which("v4l2-ctl"):
+        if _which("v4l2-ctl"):
             try:
-                out = subprocess.check_output(
-                    ["v4l2-ctl", "-d", str(devpath), "--info"],
-                    stderr=subprocess.DEVNULL,
-                    timeout=5,
-                ).decode(errors="replace")
+                _, out, _ = _run(["v4l2-ctl", "-d", str(devpath), "--info"], timeout=5)
+                out = out.decode(errors="replace")
                 for line in out.splitlines():
                     if "Card type" in line:
                         info["name"] = line.split(":", 1)[1].strip()
@@ -59,6 +140,8 @@ def list_video_devices() -> list[dict[str, str]]:
 
         devices.append(info)
 
+    _DEV_CACHE["key"] = key
+    _DEV_CACHE["devices"] = [dict(d) for d in devices]
     return devices
 
 
@@ -66,6 +149,36 @@ def list_video_devices() -> list[dict[str, str]]:
 # GStreamer availability
 # ---------------------------------------------------------------------------
 
+def _list_gst_elements(gst_inspect: str, env: dict[str, str]) -> Optional[set[str]]:
+    """Return every element name known to GStreamer, from one ``gst-inspect-1.0``.
+
+    Parses lines of the form ``plugin:  element: description``.  Returns
+    *None* if the call fails or yields nothing.
+    """
+    try:
+        rc, out, _ = _run([gst_inspect], timeout=15, env=env)
+    except Exception:
+        return None
+    if rc != 0:
+        return None
+    out = out.decode(errors="replace")
+    available: set[str] = set()
+    for line in out.splitlines():
+        parts = line.split(":", 2)
+        if len(parts) == 3:
+            available.add(parts[1].strip())
+    return available or None
+
+
+def _probe_plugin(gst_inspect: str, plugin: str, env: dict[str, str]) -> Optional[str]:
+    """Return *plugin* if ``gst-inspect-1.0`` finds it, else *None*."""
+    try:
+        rc, _, _ = _run([gst_inspect, plugin], timeout=5, env=env)
+    except Exception:
+        return None
+    return plugin if rc == 0 else None
+
+
 def check_gstreamer_install() -> dict[str, object]:
     """Verify that GStreamer is installed and report its version.
 
@@ -82,7 +195,7 @@ def check_gstreamer_install() -> dict[str, object]:
         "plugins": [],
     }
 
-    gst_path = shutil.which("gst-launch-1.0")
+    gst_path = _which("gst-launch-1.0")
     if gst_path is None:
         return result
 
@@ -92,13 +205,8 @@ def check_gstreamer_install() -> dict[str, object]:
     # Version
     try:
         env = {**os.environ, "GST_PAGER": "cat", "PAGER": "cat"}
-        out = subprocess.check_output(
-            ["gst-launch-1.0", "--version"],
-            stdin=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-            timeout=5,
-            env=env,
-        ).decode(errors="replace")
+        _, out, _ = _run(["gst-launch-1.0", "--version"], timeout=5, env=env)
+        out = out.decode(errors="replace")
         for line in out.splitlines():
             if "GStreamer" in line:
                 result["version"] = line.strip()
@@ -114,25 +222,20 @@ def check_gstreamer_install() -> dict[str, object]:
         "rtpjitterbuffer",
     ]
     found: list[str] = []
-    gst_inspect = shutil.which("gst-inspect-1.0")
+    gst_inspect = _which("gst-inspect-1.0")
     if gst_inspect:
         # Set GST_PAGER to prevent gst-inspect from launching a pager (less/more)
         # which blocks or stops the subprocess on headless / piped output.
         env = {**os.environ, "GST_PAGER": "cat", "PAGER": "cat"}
-        for plugin in required_plugins:
-            try:
-                proc = subprocess.run(
-                    [gst_inspect, plugin],
-                    stdin=subprocess.DEVNULL,
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.DEVNULL,
-                    timeout=5,
-                    env=env,
-                )
-                if proc.returncode == 0:
-                    found.append(plugin)
-            except Exception:
-                pass
+        available = _list_gst_elements(gst_inspect, env)
+        if available is not None:
+            found = [p for p in required_plugins if p in available]
+        else:
+            # Bulk listing failed – probe each element instead.  Each probe
+            # is a fork/exec that mostly waits, so run them together.
+            probe = functools.partial(_probe_plugin, gst_inspect, env=env)
+            with ThreadPoolExecutor(max_workers=8) as ex:
+                found = [p for p in ex.map(probe, required_plugins) if p is not None]
     result["plugins"] = found
     return result
 
@@ -158,7 +261,7 @@ def check_libcamera() -> dict[str, object]:
     # Try the newer name first, then the legacy name.
     cmd_name: str | None = None
     for candidate in ("rpicam-vid", "libcamera-vid"):
-        path = shutil.which(candidate)
+        path = _which(candidate)
         if path is not None:
             cmd_name = candidate
             break
@@ -171,12 +274,10 @@ def check_libcamera() -> dict[str, object]:
     result["path"] = path
 
     try:
-        out = subprocess.check_output(
-            [cmd_name, "--list-cameras"],
-            stderr=subprocess.STDOUT,
-            timeout=10,
-        ).decode(errors="replace")
-        result["cameras"] = [l.strip() for l in out.splitlines() if l.strip()]
+        returncode, out, _ = _run([cmd_name, "--list-cameras"], timeout=10, stderr=subprocess.STDOUT)
+        if returncode == 0:
+            out = out.decode(errors="replace")
+            result["cameras"] = [l.strip() for l in out.splitlines() if l.strip()]
     except Exception:
         pass
 
@@ -198,18 +299,16 @@ def test_pipeline(pipeline_str: str, timeout: float = 5.0) -> dict[str, object]:
     cmd = ["gst-launch-1.0"] + pipeline_str.split()
     result: dict[str, object] = {"success": False, "returncode": None, "stderr": ""}
     try:
-        proc = subprocess.Popen(cmd, stderr=subprocess.PIPE)
         try:
-            proc.wait(timeout=timeout)
-        except subprocess.TimeoutExpired:
+            returncode, _, stderr_data = _run(cmd, timeout=timeout)
+        except subprocess.TimeoutExpired as exc:
             # Pipeline kept running – that's considered a success.
-            proc.terminate()
-            proc.wait(timeout=3)
+            returncode = None
+            stderr_data = exc.stderr or b""
             result["success"] = True
-        result["returncode"] = proc.returncode
-        stderr_data = proc.stderr.read() if proc.stderr else b""
+        result["returncode"] = returncode
         result["stderr"] = stderr_data.decode(errors="replace")[:1000]
-        if proc.returncode == 0:
+        if returncode == 0:
             result["success"] = True
     except FileNotFoundError:
         result["stderr"] = "gst-launch-1.0 not found"
@@ -0,0 +1,97 @@
+"""Shared hardware handles for the rover's sensor modules.
+
+Each accessor does its setup once per process; later calls return the same
+object, so importing several sensor modules doesn't redo GPIO mode setup or
+reopen the I2C bus.
+"""
+from __future__ import annotations
+
+import functools
+import threading
+import time
+
+# Longest wait for the whole echo pulse; ~5 m round trip, past the HC-SR04's
+# rated range, so only a missing or lost echo hits it
+ECHO_TIMEOUT = 0.03
+
+
+@functools.lru_cache(maxsize=1)
+def gpio():
+    """Return ``RPi.GPIO``, configured for BCM pin numbering."""
+    import RPi.GPIO as GPIO
+    GPIO.setmode(GPIO.BCM)
+    return GPIO
+
+
+_buses: dict[int, object] = {}
+_buses_lock = threading.Lock()
+
+
+def i2c(bus: int = 1):
+    """Return the open ``smbus2.SMBus`` for I2C *bus* (default ``/dev/i2c-1``).
+
+    Handles are keyed on the bus number, so ``i2c()``, ``i2c(1)`` and
+    ``i2c(bus=1)`` all share one file descriptor.
+    """
+    with _buses_lock:
+        handle = _buses.get(bus)
+        if handle is None:
+            import smbus2
+            handle = _buses[bus] = smbus2.SMBus(bus)
+        return handle
+
+
+class Ultrasonic:
+    """HC-SR04 ranger timed from edge callbacks on the echo pin.
+
+    Edge detection is armed once for both edges, so a short echo from a
+    near obstacle can't slip past between two separate waits, and each edge
+    is stamped in the callback rather than after the caller wakes up.
+    """
+
+    def __init__(self, trig: int, echo: int, timeout: float = ECHO_TIMEOUT) -> None:
+        self._gpio = gpio()
+        self.trig = trig
+        self.echo = echo
+        self.timeout = timeout
+        self._edges: list[float] = []
+        self._done = threading.Event()
+        self._gpio.setup(trig, self._gpio.OUT, initial=self._gpio.LOW)
+        self._gpio.setup(echo, self._gpio.IN)
+        self._gpio.add_event_detect(echo, self._gpio.BOTH, callback=self._on_edge)
+
+    def _on_edge(self, _channel: int) -> None:
+        edges = self._edges
+        edges.append(time.perf_counter())
+        # Rising then falling edge of the echo pulse
+        if len(edges) == 2:
+            self._done.set()
+
+    def distance(self) -> float:
+        """Return the distance in metres, or ``inf`` if no echo came back."""
+        self._edges = []
+        self._done.clear()
+        self._gpio.output(self.trig, True)
+        time.sleep(0.00001)
+        self._gpio.output(self.trig, False)
+        if not self._done.wait(self.timeout):
+            return float("inf")
+        start, end = self._edges[:2]
+        return (end - start) * 17150 / 100.0
+
+
+_rangers: dict[tuple[int, int], Ultrasonic] = {}
+_rangers_lock = threading.Lock()
+
+
+def ultrasonic(trig: int, echo: int) -> Ultrasonic:
+    """Return the shared :class:`Ultrasonic` for the *trig*/*echo* pin pair.
+
+    Edge detection can only be added to a pin once, so every caller using
+    the same sensor gets the same ranger.
+    """
+    with _rangers_lock:
+        ranger = _rangers.get((trig, echo))
+        if ranger is None:
+            ranger = _rangers[(trig, echo)] = Ultrasonic(trig, echo)
+        return ranger
@@ -1,21 +1,49 @@
+import asyncio
 import time
 import threading
 import smbus2
-import RPi.GPIO as GPIO
 import os
+import queue
 from flask import Flask, Response
-import cv2
-import numpy as np
+try:
+    import simplejpeg  # libjpeg-turbo SIMD encoder, optional
+except ImportError:
+    simplejpeg = None
+
+try:
+    from MainCode.hw import gpio, i2c, ultrasonic
+except ImportError:
+    # Run directly as a script from MainCode/.
+    from hw import gpio, i2c, ultrasonic
 
 # Camera stream setup
+READ_TIMEOUT_S = 1  # upper bound on one camera read()
+
 class FrameGrabber:
     def __init__(self, device=0, width=640, height=480):
+        # OpenCV (and numpy with it) is only loaded once a grabber is built
+        import cv2
         self.cv2 = cv2
-        self._cap = self.cv2.VideoCapture(device)
+        # V4L2 ignores CAP_PROP_READ_TIMEOUT_MSEC; its select() timeout comes
+        # from this variable, read when a camera is first opened. Bounds each
+        # read() so a hung camera can't keep the loop from noticing stop()
+        os.environ.setdefault("OPENCV_VIDEOIO_V4L_SELECT_TIMEOUT", str(READ_TIMEOUT_S))
+        self._cap = self.cv2.VideoCapture(device, self.cv2.CAP_V4L2)
         self._cap.set(self.cv2.CAP_PROP_FRAME_WIDTH, width)
         self._cap.set(self.cv2.CAP_PROP_FRAME_HEIGHT, height)
+        # Have the webcam encode MJPEG on-device and take those bytes as-is
+        mjpg = self.cv2.VideoWriter_fourcc(*"MJPG")
+        self._cap.set(self.cv2.CAP_PROP_FOURCC, mjpg)
+        self._passthrough = (
+            int(self._cap.get(self.cv2.CAP_PROP_FOURCC)) == mjpg
+            and self._cap.set(self.cv2.CAP_PROP_CONVERT_RGB, 0)
+        )
         self.frame = None
+        self.raw_frame = None
         self._lock = threading.Lock()
+        # Capture thread notifies MJPEG clients when a new frame is published
+        self._frame_ready = threading.Condition(self._lock)
+        self._seq = 0
         self._running = False
         self._thread = None
 
@@ -30,6 +58,10 @@ class FrameGrabber:
         self._running = False
         if self._thread:
             self._thread.join(timeout=5)
+            if self._thread.is_alive():
+                # Still stuck in read(); releasing now would race with it
+                print("FrameGrabber: capture thread did not exit")
+                return
         if self._cap and self._cap.isOpened():
             self._cap.release()
 
@@ -39,35 +71,63 @@ class FrameGrabber:
             if not ok:
                 time.sleep(0.05)
                 continue
-            _, buf = self.cv2.imencode(".jpg", raw, [self.cv2.IMWRITE_JPEG_QUALITY, 70])
+            if self._passthrough:
+                # Zero-copy view: read() hands back a fresh array each call
+                data = memoryview(raw).cast("B")
+                if data[:2] == b"\xff\xd8":
+                    self._publish_frame(data)
+                    continue
+                # Backend decoded the frame anyway - encode in software
+                self._passthrough = False
+                self._cap.set(self.cv2.CAP_PROP_CONVERT_RGB, 1)
+                continue
+            if simplejpeg is not None:
+                data = simplejpeg.encode_jpeg(raw, quality=70, colorspace="BGR", fastdct=True)
+            else:
+                _, buf = self.cv2.imencode(".jpg", raw, [self.cv2.IMWRITE_JPEG_QUALITY, 70])
+                data = memoryview(buf).cast("B")
             with self._lock:
-                self.frame = buf.tobytes()
-            time.sleep(0.033)
+                # read() returns a fresh array each time, so no copy is needed
+                self.raw_frame = raw
+            self._publish_frame(data)
+
+    def _publish_frame(self, frame):
+        with self._lock:
+            self.frame = frame
+            self._seq += 1
+            self._frame_ready.notify_all()
 
     def get_latest_frame(self):
         with self._lock:
             return self.frame
 
     def get_latest_raw(self):
-        # Deprecated: Use get_latest_frame() for image capture
-        return None
+        # Cached frame from the capture thread - never touches the device
+        with self._lock:
+            raw, frame = self.raw_frame, self.frame
+        if raw is None and frame is not None:
+            # MJPEG passthrough keeps no BGR frame; decode only on demand
+            import numpy as np
+            raw = self.cv2.imdecode(np.frombuffer(frame, np.uint8), self.cv2.IMREAD_COLOR)
+        return raw
 
     def generate_mjpeg(self):
+        # Sleep until the capture thread publishes a frame we haven't sent
+        last_seq = 0
         while self._running:
-            frame = self.get_latest_frame()
-            if frame is None:
-                time.sleep(0.05)
-                continue
+            with self._frame_ready:
+                if not self._frame_ready.wait_for(lambda: self._seq != last_seq, timeout=1.0):
+                    continue
+                frame = self.frame
+                last_seq = self._seq
             yield (
                 b"--frame\r\n"
                 b"Content-Type: image/jpeg\r\n\r\n" + frame + b"\r\n"
             )
-            time.sleep(0.033)
 
 # Flask app for MJPEG stream
 app = Flask(__name__)
-grabber = FrameGrabber(device=0, width=640, height=480)
-grabber.start()
+grabber = None  # created by main()
 
 @app.route("/video")
 def video_feed():
@@ -80,81 +140,128 @@ def run_flask():
 PCF8591_ADDRESS = 0x48
 HALL_CHANNEL = 0
 MAGNET_THRESHOLD = 135
-bus = smbus2.SMBus(1)
 
 def read_analog(channel):
-    control_byte = channel
-    bus.write_byte(PCF8591_ADDRESS, control_byte)
-    bus.read_byte(PCF8591_ADDRESS)
-    value = bus.read_byte(PCF8591_ADDRESS)
-    return value
+    # Control byte + two reads in one transaction (repeated START);
+    # the first byte is the previous conversion, the second is ours
+    write = smbus2.i2c_msg.write(PCF8591_ADDRESS, [channel])
+    read = smbus2.i2c_msg.read(PCF8591_ADDRESS, 2)
+    # Bus is opened on first use, not at import
+    i2c().i2c_rdwr(write, read)
+    return list(read)[1]
 
 # Ultrasonic setup
 TRIG = 23
 ECHO = 24
-GPIO.setmode(GPIO.BCM)
-GPIO.setup(TRIG, GPIO.OUT)
-GPIO.setup(ECHO, GPIO.IN)
 
 def get_distance():
-    GPIO.output(TRIG, True)
-    time.sleep(0.00001)
-    GPIO.output(TRIG, False)
-    start = time.time()
-    end = time.time()
-    while GPIO.input(ECHO) == 0:
-        start = time.time()
-    while GPIO.input(ECHO) == 1:
-        end = time.time()
-    duration = end - start
-    distance = duration * 17150
-    return distance / 100.0
+    # Same edge-timed ranger (and echo timeout) as combined.py; the pins
+    # are set up on the first call, not at import
+    return ultrasonic(TRIG, ECHO).distance()
 
 OUTPUT_DIR = "captures"
+POLL_INTERVAL = 0.1     # seconds between sensor polls
+CAPTURE_COOLDOWN = 5    # seconds between hall-triggered captures
+PRINT_INTERVAL = 5      # seconds between sensor printouts
 image_counter = 0
-if not os.path.exists(OUTPUT_DIR):
-    os.makedirs(OUTPUT_DIR)
 
-last_capture_time = 0
+# Latest sensor readings, shared between the coroutines below
+latest_hall = 0
+latest_distance = float("inf")
 
- # Start Flask app in background thread
-flask_thread = threading.Thread(target=run_flask, daemon=True)
-flask_thread.start()
+def save_frame(filename, raw_frame):
+    import cv2  # deferred: only needed once a trigger actually saves
+    cv2.imwrite(filename, raw_frame)
 
-try:
-    last_print_time = 0
+# Captures are written by one dedicated thread so slow SD-card writes never
+# hold up the sensor coroutines; a full queue drops the capture
+save_q = queue.Queue(maxsize=32)
+
+def writer_loop():
+    while True:
+        item = save_q.get()
+        if item is None:
+            break
+        filename, raw_frame, distance = item
+        save_frame(filename, raw_frame)
+        print(f"Captured: {filename} | Distance: {distance:.2f}m")
+
+# Sensor coroutines: one event loop, blocking I2C/GPIO calls run in the
+# default executor so they never stall the other tasks
+async def poll_hall(triggers):
+    global latest_hall
+    loop = asyncio.get_running_loop()
+    last_trigger = float("-inf")
     while True:
-        hall_value = read_analog(HALL_CHANNEL)
-        distance = get_distance()
-        current_time = time.time()
-
-        # Print sensor values every 5 seconds
-        if current_time - last_print_time >= 5:
-            print(f"Hall: {hall_value}, Distance: {distance:.2f}m")
-            last_print_time = current_time
-
-        if hall_value > MAGNET_THRESHOLD:
-            if current_time - last_capture_time >= 5:
-                # Use latest frame from grabber for image capture
-                frame_bytes = grabber.get_latest_frame()
-                if frame_bytes is not None:
-                    # Decode JPEG bytes to numpy array for saving
-                    np_arr = cv2.imdecode(
-                        np.frombuffer(frame_bytes, np.uint8), cv2.IMREAD_COLOR
-                    )
-                    filename = f"{OUTPUT_DIR}/frame_{image_counter:04d}.jpg"
-                    cv2.imwrite(filename, np_arr)
-                    print(f"Captured: {filename} | Distance: {distance:.2f}m")
-                    image_counter += 1
-                    last_capture_time = current_time
-                else:
-                    print("Failed to capture frame")
-        time.sleep(0.1)
-
-except KeyboardInterrupt:
-    print("Exiting...")
-
-finally:
-    grabber.stop()
-    GPIO.cleanup()
-    flask_thread.terminate()
+        latest_hall = await loop.run_in_executor(None, read_analog, HALL_CHANNEL)
+        now = loop.time()
+        if latest_hall > MAGNET_THRESHOLD and now - last_trigger >= CAPTURE_COOLDOWN:
+            last_trigger = now
+            triggers.put_nowait(latest_distance)
+        await asyncio.sleep(POLL_INTERVAL)
+
+async def poll_distance():
+    global latest_distance
+    loop = asyncio.get_running_loop()
+    while True:
+        latest_distance = await loop.run_in_executor(None, get_distance)
+        await asyncio.sleep(POLL_INTERVAL)
+
+async def capture_task(triggers):
+    global image_counter
+    while True:
+        distance = await triggers.get()
+        # Use latest frame from grabber for image capture
+        raw_frame = grabber.get_latest_raw()
+        if raw_frame is None:
+            print("Failed to capture frame")
+            continue
+        filename = f"{OUTPUT_DIR}/frame_{image_counter:04d}.jpg"
+        try:
+            save_q.put_nowait((filename, raw_frame, distance))
+        except queue.Full:
+            print(f"Save queue full, dropping {filename}")
+            continue
+        image_counter += 1
+
+async def report():
+    while True:
+        print(f"Hall: {latest_hall}, Distance: {latest_distance:.2f}m")
+        await asyncio.sleep(PRINT_INTERVAL)
+
+async def run_sensors():
+    triggers = asyncio.Queue()
+    await asyncio.gather(
+        poll_hall(triggers),
+        poll_distance(),
+        capture_task(triggers),
+        report(),
+    )
+
+def main():
+    global grabber
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    grabber = FrameGrabber(device=0, width=640, height=480)
+    grabber.start()
+
+    # Start Flask app in background thread
+    flask_thread = threading.Thread(target=run_flask, daemon=True)
+    flask_thread.start()
+    writer_thread = threading.Thread(target=writer_loop, daemon=True)
+    writer_thread.start()
+
+    try:
+        asyncio.run(run_sensors())
+
+    except KeyboardInterrupt:
+        print("Exiting...")
+
+    finally:
+        # Let queued captures finish writing before shutting down
+        save_q.put(None)
+        writer_thread.join(timeout=10)
+        grabber.stop()
+        gpio().cleanup()
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,12 @@
-import RPi.GPIO as GPIO
+try:
+    from MainCode.hw import gpio
+except ImportError:
+    # Run directly as a script from MainCode/.
+    from hw import gpio
 
 IR_PIN = 17
 
-GPIO.setmode(GPIO.BCM)
+GPIO = gpio()
 GPIO.setup(IR_PIN, GPIO.IN)
 
 def is_obstacle():
@@ -1,11 +1,16 @@
 # main runner
 from __future__ import annotations
 
+import asyncio
 import logging
-import time
 from typing import Optional
 
-from MainCode.dune_detection import detect_dune, DetectionResult
+from MainCode.dune_detection import (
+    DetectionResult,
+    detect_dune_async,
+    start_background_capture,
+    stop_background_capture,
+)
 
 logger = logging.getLogger("rover")
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
@@ -23,16 +28,27 @@ def take_action(result: DetectionResult) -> None:
         # todo: motor_controls drive forward
 
 
+async def _main(loop_delay: float, use_camera: bool, distance_threshold: float) -> None:
+    while True:
+        # the loop delay runs alongside detection instead of after it
+        tick = asyncio.create_task(asyncio.sleep(loop_delay))
+        result = await detect_dune_async(distance_threshold=distance_threshold, use_camera=use_camera)
+        logger.info("distance=%.2fm obstacle=%s confidence=%.2f", result.distance, result.obstacle, result.dune_confidence)
+        take_action(result)
+        await tick
+
+
 def main(loop_delay: float = 1.0, use_camera: bool = True, distance_threshold: float = 1.0) -> None:
     logger.info("Starting rover loop (camera=%s, distance_threshold=%.2fm)", use_camera, distance_threshold)
+    if use_camera:
+        # capture the next frame while the current one is analysed
+        start_background_capture()
     try:
-        while True:
-            result = detect_dune(distance_threshold=distance_threshold, use_camera=use_camera)
-            logger.info("distance=%.2fm obstacle=%s confidence=%.2f", result.distance, result.obstacle, result.dune_confidence)
-            take_action(result)
-            time.sleep(loop_delay)
+        asyncio.run(_main(loop_delay, use_camera, distance_threshold))
     except KeyboardInterrupt:
         logger.info("Shutting down rover loop")
+    finally:
+        stop_background_capture()
 
 
 if __name__ == "__main__":
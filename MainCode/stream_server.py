@@ -22,11 +22,16 @@ Usage
 Requires
 --------
     pip install flask opencv-python
+
+Optional: ``pip install waitress`` (production WSGI server; without it the
+app falls back to Flask's development server, which is not supported for
+deployment) and ``pip install simplejpeg`` (faster software JPEG encode).
 """
 from __future__ import annotations
 
 import argparse
 import logging
+import os
 import threading
 import time
 from typing import Generator, Optional
@@ -59,10 +64,24 @@ def _import_cv2():
         )
 
 
+def _import_simplejpeg():
+    """Return the optional ``simplejpeg`` module, or *None* if missing."""
+    try:
+        import simplejpeg
+        return simplejpeg
+    except ImportError:
+        return None
+
+
 # ---------------------------------------------------------------------------
 # Frame generator for MJPEG
 # ---------------------------------------------------------------------------
 
+# Upper bound (s) on a single OpenCV read() so stop() is never blocked by a
+# hung USB camera.
+READ_TIMEOUT_S = 1
+
+
 class FrameGrabber:
     """Continuously capture frames in a background thread.
 
@@ -71,35 +90,60 @@ class FrameGrabber:
     via ``.frame``.
     """
 
-    def __init__(self, device: int = 0, width: int = 1280, height: int = 720) -> None:
+    def __init__(
+        self,
+        device: int = 0,
+        width: int = 1280,
+        height: int = 720,
+        capture_cpu: Optional[int] = None,
+    ) -> None:
         self.cv2 = _import_cv2()
+        # libjpeg-turbo (NEON on the Pi) when available; cv2.imencode otherwise
+        self._simplejpeg = _import_simplejpeg()
         self._width = width
         self._height = height
         self._device = device
+        # CPU to pin the software capture/encode thread to (None = no pinning)
+        self._capture_cpu = capture_cpu
 
         self._picam = None
         self._cap = None
+        self._hw_encoder = None
+        self._passthrough = False
+        self._bgr = None  # reused BGR frame buffer (Picamera2 software path)
 
         # Try Picamera2 first (Pi Camera)
         try:
             from picamera2 import Picamera2
             self._picam = Picamera2()
-            self._picam.configure(
-                self._picam.create_video_configuration(
-                    main={"size": (width, height), "format": "BGR888"}
-                )
-            )
+            self._configure_picam("BGR888")
             self._picam.start()
             logger.info("FrameGrabber: using Picamera2 backend.")
         except Exception as exc:
             logger.debug("Picamera2 not available (%s), falling back to OpenCV.", exc)
             self._picam = None
-            self._cap = self.cv2.VideoCapture(device)
+            # The V4L2 backend ignores CAP_PROP_READ_TIMEOUT_MSEC; its select()
+            # timeout comes from this variable, read when a camera is first
+            # opened. It bounds each read() so a hung camera can't keep the
+            # capture loop from noticing stop().
+            os.environ.setdefault("OPENCV_VIDEOIO_V4L_SELECT_TIMEOUT", str(READ_TIMEOUT_S))
+            self._cap = self.cv2.VideoCapture(device, self.cv2.CAP_V4L2)
             self._cap.set(self.cv2.CAP_PROP_FRAME_WIDTH, width)
             self._cap.set(self.cv2.CAP_PROP_FRAME_HEIGHT, height)
+            # USB webcams can encode MJPEG on-device; take those bytes as-is.
+            mjpg = self.cv2.VideoWriter_fourcc(*"MJPG")
+            self._cap.set(self.cv2.CAP_PROP_FOURCC, mjpg)
+            self._passthrough = (
+                int(self._cap.get(self.cv2.CAP_PROP_FOURCC)) == mjpg
+                and self._cap.set(self.cv2.CAP_PROP_CONVERT_RGB, 0)
+            )
 
-        self.frame: Optional[bytes] = None
+        # JPEG bytes, or a memoryview over a per-frame encoder buffer
+        self.frame: Optional[bytes | memoryview] = None
         self._lock = threading.Lock()
+        # Producers notify MJPEG clients when a new frame is published.
+        self._frame_ready = threading.Condition(self._lock)
+        self._seq = 0
         self._running = False
         self._thread: Optional[threading.Thread] = None
 
@@ -107,13 +151,74 @@ class FrameGrabber:
         if self._running:
             return
         self._running = True
+        if self._picam is not None and self._start_hw_jpeg():
+            return
         self._thread = threading.Thread(target=self._capture_loop, daemon=True)
         self._thread.start()
 
+    def _configure_picam(self, fmt: str) -> None:
+        self._picam.configure(
+            self._picam.create_video_configuration(
+                main={"size": (self._width, self._height), "format": fmt}
+            )
+        )
+
+    def _start_hw_jpeg(self) -> bool:
+        """Feed ``.frame`` from the Pi's hardware MJPEG encoder (V4L2 M2M).
+
+        Picamera2 hands each ISP buffer to the encoder as a DMABUF, so frames
+        go ISP → hardware JPEG without being mapped into Python or touching
+        ``cv2.imencode``.  The stream is switched to YUV420 for this path
+        (half the bytes of BGR888 per frame).  Returns *False* if the
+        encoder is unavailable, in which case the BGR888 configuration is
+        restored and the software capture loop is used instead.
+        """
+        try:
+            from picamera2.encoders import MJPEGEncoder
+            from picamera2.outputs import Output
+
+            grabber = self
+
+            class _FrameOutput(Output):
+                def outputframe(self, frame, keyframe=True, timestamp=None, *args, **kwargs):
+                    grabber._publish_frame(bytes(frame))
+
+            self._picam.stop()
+            self._configure_picam("YUV420")
+            self._hw_encoder = MJPEGEncoder()
+            self._picam.start_encoder(self._hw_encoder, _FrameOutput())
+            self._picam.start()
+        except Exception as exc:
+            logger.debug("Hardware MJPEG encoder unavailable (%s); using cv2.imencode.", exc)
+            self._hw_encoder = None
+            try:
+                self._picam.stop_encoder()
+            except Exception:
+                pass
+            try:
+                self._picam.stop()
+                self._configure_picam("BGR888")
+                self._picam.start()
+            except Exception as restore_exc:
+                logger.warning("Could not restore Picamera2 BGR888 mode: %s", restore_exc)
+            return False
+        logger.info("FrameGrabber: using hardware MJPEG encoder.")
+        return True
+
     def stop(self) -> None:
         self._running = False
         if self._thread is not None:
             self._thread.join(timeout=5)
+            if self._thread.is_alive():
+                # Still stuck in a capture call; releasing now would race it.
+                logger.warning("FrameGrabber: capture thread did not exit.")
+                return
+        if self._hw_encoder is not None:
+            try:
+                self._picam.stop_encoder()
+            except Exception:
+                pass
+            self._hw_encoder = None
         if self._picam is not None:
             try:
                 self._picam.stop()
@@ -122,15 +227,34 @@ class FrameGrabber:
         if self._cap is not None and self._cap.isOpened():
             self._cap.release()
 
+    def _pin_capture_thread(self) -> None:
+        """Bind the calling thread to ``capture_cpu`` and raise its priority.
+
+        Keeps the capture/encode loop off the cores servicing IRQs and HTTP
+        clients.  The priority bump needs CAP_SYS_NICE (or root); without
+        it only the affinity is applied.
+        """
+        if self._capture_cpu is None or not hasattr(os, "sched_setaffinity"):
+            return
+        try:
+            # pid 0 = the calling thread on Linux
+            os.sched_setaffinity(0, {self._capture_cpu})
+        except OSError as exc:
+            logger.warning("Could not pin capture thread to CPU %d: %s", self._capture_cpu, exc)
+            return
+        try:
+            os.nice(-5)
+        except OSError as exc:
+            logger.debug("Could not raise capture thread priority: %s", exc)
+        logger.info("Capture thread pinned to CPU %d.", self._capture_cpu)
+
     def _capture_loop(self) -> None:
+        self._pin_capture_thread()
         while self._running:
             raw = None
             if self._picam is not None:
                 try:
-                    raw = self._picam.capture_array()
-                    # Always convert from RGB to BGR for OpenCV compatibility
-                    if raw is not None and raw.shape[-1] == 3:
-                        raw = self.cv2.cvtColor(raw, self.cv2.COLOR_RGB2BGR)
+                    raw = self._capture_picam_bgr()
                 except Exception:
                     time.sleep(0.05)
                     continue
@@ -139,29 +263,81 @@ class FrameGrabber:
                 if not ok:
                     time.sleep(0.05)
                     continue
+                if self._passthrough:
+                    # Zero-copy view: read() hands back a fresh array each call
+                    data = memoryview(raw).cast("B")
+                    if data[:2] == b"\xff\xd8":
+                        self._publish_frame(data)
+                        continue
+                    # Backend decoded the frame anyway – encode in software.
+                    self._passthrough = False
+                    self._cap.set(self.cv2.CAP_PROP_CONVERT_RGB, 1)
+                    continue
             else:
                 time.sleep(0.1)
                 continue
 
             if raw is not None:
-                _, buf = self.cv2.imencode(".jpg", raw, [self.cv2.IMWRITE_JPEG_QUALITY, 70])
-                with self._lock:
-                    self.frame = buf.tobytes()
+                self._publish_frame(self._encode_jpeg(raw))
+
+    def _encode_jpeg(self, raw) -> bytes | memoryview:
+        """JPEG-encode a BGR frame at quality 70.
+
+        Returns the encoder's own output buffer (``bytes`` or a view of the
+        ``imencode`` array) rather than copying it again.
+        """
+        if self._simplejpeg is not None:
+            return self._simplejpeg.encode_jpeg(
+                raw, quality=70, colorspace="BGR", fastdct=True
+            )
+        _, buf = self.cv2.imencode(".jpg", raw, [self.cv2.IMWRITE_JPEG_QUALITY, 70])
+        return memoryview(buf).cast("B")
+
+    def _capture_picam_bgr(self):
+        """Return the next Picamera2 frame as BGR, in a reused buffer.
+
+        Reads the request's DMA buffer in place (``MappedArray``) and
+        colour-converts straight into ``self._bgr``, so no frame-sized array
+        is allocated per frame.  The returned buffer is overwritten by the
+        next call.
+        """
+        from picamera2 import MappedArray
+
+        request = self._picam.capture_request()
+        try:
+            with MappedArray(request, "main") as mapped:
+                src = mapped.array
+                if self._bgr is None or self._bgr.shape != src.shape:
+                    self._bgr = self.cv2.cvtColor(src, self.cv2.COLOR_RGB2BGR)
+                else:
+                    self.cv2.cvtColor(src, self.cv2.COLOR_RGB2BGR, dst=self._bgr)
+        finally:
+            request.release()
+        return self._bgr
+
+    def _publish_frame(self, frame: bytes) -> None:
+        with self._lock:
+            self.frame = frame
+            self._seq += 1
+            self._frame_ready.notify_all()
 
     def generate_mjpeg(self) -> Generator[bytes, None, None]:
-        """Yield multipart JPEG frames suitable for an HTTP response."""
+        """Yield multipart JPEG frames suitable for an HTTP response.
+
+        Blocks until a frame newer than the last one sent is published, so
+        each client wakes once per frame rather than polling.
+        """
+        last_seq = 0
         while self._running:
-            with self._lock:
+            with self._frame_ready:
+                if not self._frame_ready.wait_for(lambda: self._seq != last_seq, timeout=1.0):
+                    continue
                 frame = self.frame
-            if frame is None:
-                time.sleep(0.05)
-                continue
+                last_seq = self._seq
             yield (
                 b"--frame\r\n"
                 b"Content-Type: image/jpeg\r\n\r\n" + frame + b"\r\n"
             )
-            # ~30 fps cap
-            time.sleep(0.033)
 
 
 # ---------------------------------------------------------------------------
@@ -172,6 +348,7 @@ def create_app(
     target_ip: str = "127.0.0.1",
     target_port: int = 5000,
     video_device: int = 0,
+    capture_cpu: Optional[int] = None,
 ) -> "Flask":
     """Create and return the Flask application.
 
@@ -183,6 +360,8 @@ def create_app(
         Default target UDP port.
     video_device : int
         OpenCV device index for MJPEG preview.
+    capture_cpu : int, optional
+        Pin the MJPEG capture thread to this CPU (see ``FrameGrabber``).
     """
     from MainCode.camera_manager import CameraManager, CameraType
 
@@ -190,7 +369,7 @@ def create_app(
 
     app = Flask(__name__)
     cam_manager = CameraManager(target_ip=target_ip, target_port=target_port)
-    grabber = FrameGrabber(device=video_device)
+    grabber = FrameGrabber(device=video_device, capture_cpu=capture_cpu)
     grabber.start()
 
     # TODO: Plug in Falconia authentication / access control here.
@@ -274,20 +453,35 @@ def main() -> None:
     parser.add_argument("--flask-host", default="0.0.0.0", help="Flask bind address")
     parser.add_argument("--flask-port", type=int, default=8080, help="Flask HTTP port")
     parser.add_argument("--video-device", type=int, default=0, help="OpenCV device index")
+    parser.add_argument(
+        "--capture-cpu", type=int, default=None, metavar="N",
+        help="Pin the MJPEG capture thread to CPU N (e.g. 2 on a Pi 4, leaving "
+             "0-1 for IRQs) and renice it to -5; the renice needs CAP_SYS_NICE or root",
+    )
     args = parser.parse_args()
 
     app = create_app(
         target_ip=args.ip,
         target_port=args.port,
         video_device=args.video_device,
+        capture_cpu=args.capture_cpu,
     )
 
     print(f"MJPEG preview → http://{args.flask_host}:{args.flask_port}/video")
     print(f"RTP target    → udp://{args.ip}:{args.port}")
     print()
 
-    # TODO: Replace with a production WSGI server (gunicorn / waitress) for deployment.
-    app.run(host=args.flask_host, port=args.flask_port, threaded=True)
+    try:
+        from waitress import serve
+    except ImportError:
+        logger.warning(
+            "waitress not installed; using Flask's development server "
+            "(not for deployment – pip install waitress)."
+        )
+        app.run(host=args.flask_host, port=args.flask_port, threaded=True)
+    else:
+        # Each MJPEG viewer holds a worker thread for as long as it watches.
+        serve(app, host=args.flask_host, port=args.flask_port, threads=8)
 
 
 if __name__ == "__main__":
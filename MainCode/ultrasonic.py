@@ -1,34 +1,14 @@
-import RPi.GPIO as GPIO
+try:
+    from MainCode.hw import gpio
+except ImportError:
+    # Run directly as a script from MainCode/.
+    from hw import gpio
 import time
 
 TRIG = 23
 ECHO = 24
 
-GPIO.setmode(GPIO.BCM)
-GPIO.setup(TRIG, GPIO.OUT)
-GPIO.setup(ECHO, GPIO.IN)
-
-def get_distance():
-    GPIO.output(TRIG, True)
-    time.sleep(0.00001)
-    GPIO.output(TRIG, False)
-
-    while GPIO.input(ECHO) == 0:
-        start = time.time()
-
-    while GPIO.input(ECHO) == 1:
-        end = time.time()
-
-    duration = end - start
-    distance = duration * 17150  # cm
-    return distance / 100.0      # meters
-import RPi.GPIO as GPIO
-import time
-
-TRIG = 23
-ECHO = 24
-
-GPIO.setmode(GPIO.BCM)
+GPIO = gpio()
 GPIO.setup(TRIG, GPIO.OUT)
 GPIO.setup(ECHO, GPIO.IN)
 
@@ -6,6 +6,7 @@ Run as a script to open a live preview window. Press 'q' or ESC to exit.
 """
 from __future__ import annotations
 
+import atexit
 import logging
 from typing import Any, Optional
 
@@ -13,6 +14,7 @@ logger = logging.getLogger(__name__)
 
 _use_picam = False
 _picam_instance: Optional["Picamera2"] = None
+_cv_cap: Optional["cv2.VideoCapture"] = None
 
 try:
 	from picamera2 import Picamera2
@@ -20,6 +22,17 @@ try:
 except Exception:
 	_use_picam = False
 
+# Resolved once here rather than on every capture_frame() call
+try:
+	import numpy as np
+except Exception:  # pragma: no cover - runtime dependent
+	np = None
+
+try:
+	import cv2
+except Exception:  # pragma: no cover - runtime dependent
+	cv2 = None
+
 
 def _init_picam() -> None:
 	global _picam_instance
@@ -31,16 +44,32 @@ def _init_picam() -> None:
 			logger.debug("failed to start Picamera2: %s", exc)
 
 
+def _init_cv_cap() -> None:
+	"""Open the OpenCV camera once and keep it for the process lifetime."""
+	global _cv_cap
+	if _cv_cap is None:
+		cap = cv2.VideoCapture(0)
+		if not cap.isOpened():
+			cap.release()
+			raise RuntimeError("Unable to open default camera (index 0)")
+		_cv_cap = cap
+
+
+def _release_cv_cap() -> None:
+	global _cv_cap
+	if _cv_cap is not None:
+		_cv_cap.release()
+		_cv_cap = None
+
+
+atexit.register(_release_cv_cap)
+
+
 def capture_frame() -> Any:
 	"""Capture and return a single frame (numpy array-like).
 
 	Uses Picamera2 if available, otherwise falls back to OpenCV VideoCapture.
 	"""
-	try:
-		import numpy as np  # ensure numpy available for consistent frame type
-	except Exception:
-		np = None
-
 	if _use_picam:
 		try:
 			_init_picam()
@@ -50,18 +79,11 @@ def capture_frame() -> Any:
 			logger.debug("Picamera2 capture failed: %s", exc)
 
 	# Fallback to OpenCV
-	try:
-		import cv2
-	except Exception as exc:  # pragma: no cover - runtime dependent
-		raise RuntimeError("No camera backend available: install picamera2 or opencv-python") from exc
-
-	cap = cv2.VideoCapture(0)
-	if not cap.isOpened():
-		cap.release()
-		raise RuntimeError("Unable to open default camera (index 0)")
-
-	ret, frame = cap.read()
-	cap.release()
+	if cv2 is None:
+		raise RuntimeError("No camera backend available: install picamera2 or opencv-python")
+
+	_init_cv_cap()
+	ret, frame = _cv_cap.read()
 	if not ret:
 		raise RuntimeError("Failed to read frame from camera")
 
@@ -69,9 +91,7 @@ def capture_frame() -> Any:
 
 
 def _preview_loop() -> None:
-	try:
-		import cv2
-	except Exception:
+	if cv2 is None:
 		raise RuntimeError("OpenCV is required for preview. Install opencv-python.")
 
 	if _use_picam:
@@ -79,9 +99,22 @@ def _preview_loop() -> None:
 
 	win = "camera_preview"
 	cv2.namedWindow(win, cv2.WINDOW_NORMAL)
+	# OpenCV path: grab() + retrieve() into one reused buffer instead of a
+	# fresh array per frame from read()
+	use_cv_cap = not _use_picam
+	buf = None
 	while True:
 		try:
-			frame = capture_frame()
+			if use_cv_cap:
+				_init_cv_cap()
+				if not _cv_cap.grab():
+					raise RuntimeError("Failed to grab frame from camera")
+				ok, buf = _cv_cap.retrieve(buf)
+				if not ok:
+					raise RuntimeError("Failed to decode frame from camera")
+				frame = buf
+			else:
+				frame = capture_frame()
 		except Exception as exc:
 			logger.error("capture_frame error: %s", exc)
 			break
@@ -94,7 +127,8 @@ def _preview_loop() -> None:
 		try:
 			cv2.imshow(win, frame)
 		except Exception:
-			import numpy as np
+			if np is None:
+				raise
 			cv2.imshow(win, np.asarray(frame))
 
 		key = cv2.waitKey(1) & 0xFF
@@ -15,12 +15,13 @@ def read_analog(channel):
     # Control byte: just the channel number (no DAC enable)
     control_byte = channel
     
-    # First read is previous value, second read is current
-    bus.write_byte(PCF8591_ADDRESS, control_byte)
-    bus.read_byte(PCF8591_ADDRESS)  # Discard first read
-    value = bus.read_byte(PCF8591_ADDRESS)  # Get actual value
+    # Write + 2-byte read in a single I2C transaction (repeated START).
+    # First byte is the previous conversion, second is the current one.
+    write = smbus2.i2c_msg.write(PCF8591_ADDRESS, [control_byte])
+    read = smbus2.i2c_msg.read(PCF8591_ADDRESS, 2)
+    bus.i2c_rdwr(write, read)
     
-    return value
+    return list(read)[1]  # Discard first byte, keep actual value
 
 try:
     print("Analog Hall Sensor Test")
@@ -5,7 +5,11 @@ Reads analog data from PCF8591 ADC at I2C address 0x48
 Uses smbus2 for I2C communication
 """
 
+import argparse
+import asyncio
 import smbus2
+import statistics
+from smbus2 import i2c_msg
 import time
 import sys
 
@@ -15,12 +19,47 @@ PCF8591_CMD_CHANNEL0 = 0x00
 PCF8591_CMD_CHANNEL1 = 0x01
 PCF8591_CMD_CHANNEL2 = 0x02
 PCF8591_CMD_CHANNEL3 = 0x03
+PCF8591_AUTO_INCREMENT = 0x04  # Control bit: advance channel after each read
+PCF8591_DAC_ENABLE = 0x40  # Control bit: drive AOUT from the DAC register
 
 READ_INTERVAL = 0.1  # 10 Hz sampling
 
+# The PCF8591 supports Fast-mode I2C; the Pi defaults to 100 kHz. smbus2's
+# per-call overhead is small next to wire time, so the bus clock matters most.
+# Enable with "dtparam=i2c_arm_baudrate=400000" in /boot/config.txt (or
+# /boot/firmware/config.txt on Bookworm) and reboot.
+I2C_MIN_BAUDRATE = 400000
+
+# Channel the ADC's control register currently selects (None = unknown)
+_last_channel = None
+
+
+def summarize(values):
+    """Return (min, max, mean) of a list of ADC readings, or None if empty"""
+    if not values:
+        return None
+    return min(values), max(values), statistics.fmean(values)
+
+
+def read_i2c_baudrate(bus_num=1):
+    """Return the bus clock in Hz from the device tree, or None if unknown"""
+    path = f"/sys/class/i2c-adapter/i2c-{bus_num}/of_node/clock-frequency"
+    try:
+        with open(path, "rb") as f:
+            # Device-tree property: one big-endian u32
+            return int.from_bytes(f.read(4), "big")
+    except OSError:
+        return None
+
 
 def init_bus(bus_num=1):
     """Initialize I2C bus"""
+    baudrate = read_i2c_baudrate(bus_num)
+    if baudrate is not None and baudrate < I2C_MIN_BAUDRATE:
+        print(f"Warning: I2C bus {bus_num} runs at {baudrate // 1000} kHz; "
+              f"PCF8591 supports {I2C_MIN_BAUDRATE // 1000} kHz.")
+        print(f"  Add 'dtparam=i2c_arm_baudrate={I2C_MIN_BAUDRATE}' to "
+              "/boot/config.txt and reboot.")
     try:
         bus = smbus2.SMBus(bus_num)
         return bus
@@ -32,33 +71,44 @@ def init_bus(bus_num=1):
 def read_channel(bus, channel):
     """
     Read analog value from specified channel (0-3)
-    Implements PCF8591 dummy-read sequence:
-    - First read returns previous conversion result
-    - Send command for desired channel
-    - Second read returns current conversion result
+    Implements PCF8591 dummy-read sequence in one combined I2C transaction:
+    - Write control byte for desired channel
+    - Repeated START, read 2 bytes
+    - First byte is previous conversion result, second is current
+    The control byte is only written when the channel changes; repeated
+    reads of the same channel are a bare 2-byte read.
     """
+    global _last_channel
     if channel < 0 or channel > 3:
         print(f"Invalid channel {channel}. Must be 0-3")
         return None
     
     try:
-        # Write control byte to select the channel
-        bus.write_byte(PCF8591_ADDR, channel)
-        
-        # Dummy read (discard result, selects channel for next read)
-        bus.read_byte(PCF8591_ADDR)
+        read = i2c_msg.read(PCF8591_ADDR, 2)
+        if channel != _last_channel:
+            write = i2c_msg.write(PCF8591_ADDR, [channel])
+            bus.i2c_rdwr(write, read)
+            _last_channel = channel
+        else:
+            bus.i2c_rdwr(read)
         
-        # Actual read from selected channel
-        value = bus.read_byte(PCF8591_ADDR)
-        return value
+        # Discard the stale byte, keep the selected channel's conversion
+        return list(read)[1]
     except Exception as e:
+        _last_channel = None
         print(f"Error reading channel {channel}: {e}")
         return None
 
 
-def read_channel0_continuous(bus, duration=10, verbose=True):
+async def read_channel0_async(bus, duration=10, verbose=True):
     """
-    Read analog channel 0 continuously at 10 Hz
+    Read analog channel 0 continuously at 10 Hz as a coroutine
+    
+    The blocking I2C transfer runs in the default executor concurrently
+    with a sleep to the next READ_INTERVAL deadline on the monotonic clock,
+    so the cadence is phase-locked rather than drifting with I2C latency;
+    ticks missed on overrun are dropped. Other tasks on the same event
+    loop keep running.
     
     Args:
         bus: SMBus instance
@@ -66,21 +116,42 @@ def read_channel0_continuous(bus, duration=10, verbose=True):
         verbose: Print values to console
     """
     print(f"\nReading Channel 0 for {duration} seconds...")
+    loop = asyncio.get_running_loop()
     start_time = time.time()
     count = 0
+    next_t = time.monotonic()
     
     while time.time() - start_time < duration:
-        value = read_channel(bus, PCF8591_CMD_CHANNEL0)
+        next_t += READ_INTERVAL
+        value, _ = await asyncio.gather(
+            loop.run_in_executor(None, read_channel, bus, PCF8591_CMD_CHANNEL0),
+            asyncio.sleep(max(0.0, next_t - time.monotonic())),
+        )
+        # Overran by whole periods: skip those ticks instead of bursting
+        missed = (time.monotonic() - next_t) // READ_INTERVAL
+        if missed > 0:
+            next_t += missed * READ_INTERVAL
         if value is not None:
             if verbose:
                 print(f"Channel 0: {value:3d} (Raw: 0x{value:02x})")
             count += 1
-        time.sleep(READ_INTERVAL)
     
     print(f"Read {count} samples in {time.time() - start_time:.1f} seconds")
     return count
 
 
+def read_channel0_continuous(bus, duration=10, verbose=True):
+    """
+    Read analog channel 0 continuously at 10 Hz
+    
+    Args:
+        bus: SMBus instance
+        duration: How long to read in seconds
+        verbose: Print values to console
+    """
+    return asyncio.run(read_channel0_async(bus, duration, verbose))
+
+
 def test_all_channels(bus, samples_per_channel=5):
     """
     Test all four analog channels
@@ -99,18 +170,28 @@ def test_all_channels(bus, samples_per_channel=5):
         (PCF8591_CMD_CHANNEL3, "Channel 3 (AIN3)"),
     ]
     
+    # Auto-increment from channel 0: one 5-byte read returns the stale
+    # conversion followed by AIN0..AIN3, so each sample set is one transaction
+    global _last_channel
+    samples = {cmd: [] for cmd, _ in channels}
+    # The auto-increment control byte changes the selected channel
+    _last_channel = None
+    for i in range(samples_per_channel):
+        try:
+            write = i2c_msg.write(PCF8591_ADDR, [PCF8591_AUTO_INCREMENT | PCF8591_CMD_CHANNEL0])
+            read = i2c_msg.read(PCF8591_ADDR, 5)
+            bus.i2c_rdwr(write, read)
+            data = list(read)
+            for cmd, _ in channels:
+                samples[cmd].append(data[cmd + 1])
+        except Exception as e:
+            print(f"Error reading channels: {e}")
+        time.sleep(0.05)
+    
     for cmd, label in channels:
-        values = []
-        for i in range(samples_per_channel):
-            value = read_channel(bus, cmd)
-            if value is not None:
-                values.append(value)
-            time.sleep(0.05)
-        
-        if values:
-            avg = sum(values) / len(values)
-            min_val = min(values)
-            max_val = max(values)
+        stats = summarize(samples[cmd])
+        if stats:
+            min_val, max_val, avg = stats
             print(f"{label}: min={min_val:3d}, max={max_val:3d}, avg={avg:6.1f}")
         else:
             print(f"{label}: ERROR - No valid readings")
@@ -118,6 +199,55 @@ def test_all_channels(bus, samples_per_channel=5):
     print("-" * 40)
 
 
+def _check_gnd(values, threshold_low):
+    """Print and return (passed, avg) for the GND phase"""
+    stats = summarize(values)
+    if stats is None:
+        print("GND Test: no valid readings")
+        print("Result: FAIL")
+        return False, None
+    lo, hi, avg = stats
+    ok = avg < threshold_low
+    print(f"GND Test: min={lo}, max={hi}, avg={avg:.1f}")
+    print(f"Result: {'PASS' if ok else 'FAIL'} (threshold < {threshold_low})")
+    return ok, avg
+
+
+def _check_3v3(values, threshold_high):
+    """Print and return (passed, avg) for the 3.3V phase"""
+    stats = summarize(values)
+    if stats is None:
+        print("3.3V Test: no valid readings")
+        print("Result: FAIL")
+        return False, None
+    lo, hi, avg = stats
+    ok = avg > threshold_high
+    print(f"3.3V Test: min={lo}, max={hi}, avg={avg:.1f}")
+    print(f"Result: {'PASS' if ok else 'FAIL'} (threshold > {threshold_high})")
+    return ok, avg
+
+
+def _wiring_summary(gnd_ok, v3v3_ok, avg_gnd, avg_3v3):
+    """Print the overall verdict and return the results dict"""
+    print("\n" + "="*50)
+    if gnd_ok and v3v3_ok:
+        print("✓ PCF8591 wiring appears CORRECT")
+    else:
+        print("✗ PCF8591 wiring has issues:")
+        if not gnd_ok:
+            print("  - GND test failed (check AIN0 to GND connection)")
+        if not v3v3_ok:
+            print("  - 3.3V test failed (check AIN0 to 3.3V connection)")
+    print("="*50 + "\n")
+    
+    return {
+        "gnd_test": gnd_ok,
+        "v3v3_test": v3v3_ok,
+        "gnd_avg": avg_gnd,
+        "v3v3_avg": avg_3v3,
+    }
+
+
 def detect_wiring(bus, samples=10, threshold_low=10, threshold_high=245):
     """
     Detect if PCF8591 is wired correctly
@@ -146,11 +276,7 @@ def detect_wiring(bus, samples=10, threshold_low=10, threshold_high=245):
             values_gnd.append(value)
         time.sleep(0.1)
     
-    avg_gnd = sum(values_gnd) / len(values_gnd) if values_gnd else None
-    gnd_ok = avg_gnd is not None and avg_gnd < threshold_low
-    
-    print(f"GND Test: min={min(values_gnd)}, max={max(values_gnd)}, avg={avg_gnd:.1f}")
-    print(f"Result: {'PASS' if gnd_ok else 'FAIL'} (threshold < {threshold_low})")
+    gnd_ok, avg_gnd = _check_gnd(values_gnd, threshold_low)
     
     print("\nTest 2: Connect AIN0 to 3.3V, press ENTER to continue...")
     input()
@@ -162,33 +288,70 @@ def detect_wiring(bus, samples=10, threshold_low=10, threshold_high=245):
             values_3v3.append(value)
         time.sleep(0.1)
     
-    avg_3v3 = sum(values_3v3) / len(values_3v3) if values_3v3 else None
-    v3v3_ok = avg_3v3 is not None and avg_3v3 > threshold_high
+    v3v3_ok, avg_3v3 = _check_3v3(values_3v3, threshold_high)
     
-    print(f"3.3V Test: min={min(values_3v3)}, max={max(values_3v3)}, avg={avg_3v3:.1f}")
-    print(f"Result: {'PASS' if v3v3_ok else 'FAIL'} (threshold > {threshold_high})")
+    return _wiring_summary(gnd_ok, v3v3_ok, avg_gnd, avg_3v3)
+
+
+def _read_with_dac(bus, dac_value):
+    """Read AIN0 while the DAC drives dac_value (control 0x40 keeps it on)"""
+    write = i2c_msg.write(PCF8591_ADDR, [PCF8591_DAC_ENABLE | PCF8591_CMD_CHANNEL0, dac_value])
+    read = i2c_msg.read(PCF8591_ADDR, 2)
+    bus.i2c_rdwr(write, read)
+    return list(read)[1]
+
+
+def detect_wiring_auto(bus, samples=10, threshold_low=10, threshold_high=245):
+    """
+    Unattended wiring test: requires AOUT (DAC) jumpered to AIN0
+    - DAC at 0x00 stands in for GND, 0xFF for 3.3V
+    - Both phases run back-to-back with no prompts
     
+    Returns:
+        dict with test results (same as detect_wiring)
+    """
+    global _last_channel
     print("\n" + "="*50)
-    if gnd_ok and v3v3_ok:
-        print("✓ PCF8591 wiring appears CORRECT")
-    else:
-        print("✗ PCF8591 wiring has issues:")
-        if not gnd_ok:
-            print("  - GND test failed (check AIN0 to GND connection)")
-        if not v3v3_ok:
-            print("  - 3.3V test failed (check AIN0 to 3.3V connection)")
-    print("="*50 + "\n")
+    print("PCF8591 Wiring Detection (auto, AOUT -> AIN0)")
+    print("="*50)
     
-    return {
-        "gnd_test": gnd_ok,
-        "v3v3_test": v3v3_ok,
-        "gnd_avg": avg_gnd,
-        "v3v3_avg": avg_3v3,
-    }
+    phases = []
+    for dac_value in (0x00, 0xFF):
+        values = []
+        try:
+            _read_with_dac(bus, dac_value)
+            time.sleep(0.01)  # let the DAC output settle
+            for i in range(samples):
+                values.append(_read_with_dac(bus, dac_value))
+        except Exception as e:
+            print(f"Error reading with DAC={dac_value:#04x}: {e}")
+        phases.append(values)
+    
+    # Switch the DAC back off; the control register no longer matches the cache
+    try:
+        bus.i2c_rdwr(i2c_msg.write(PCF8591_ADDR, [PCF8591_CMD_CHANNEL0]))
+    except Exception:
+        pass
+    _last_channel = None
+    
+    if not all(phases):
+        print("✗ No valid readings - check I2C wiring and the AOUT -> AIN0 jumper")
+        return {"gnd_test": False, "v3v3_test": False, "gnd_avg": None, "v3v3_avg": None}
+    gnd_ok, avg_gnd = _check_gnd(phases[0], threshold_low)
+    v3v3_ok, avg_3v3 = _check_3v3(phases[1], threshold_high)
+    return _wiring_summary(gnd_ok, v3v3_ok, avg_gnd, avg_3v3)
 
 
 def main():
     """Main entry point"""
+    parser = argparse.ArgumentParser(description="PCF8591 ADC debugging script")
+    parser.add_argument(
+        "--auto", action="store_true",
+        help="Run the wiring test unattended (needs AOUT jumpered to AIN0) "
+             "and exit 0 on PASS, 1 on FAIL",
+    )
+    args = parser.parse_args()
+    
     print("PCF8591 ADC Debugging Script")
     print("I2C Address: 0x48")
     print("-" * 40)
@@ -200,6 +363,13 @@ def main():
         print(f"Failed to initialize I2C bus: {e}")
         sys.exit(1)
     
+    if args.auto:
+        try:
+            result = detect_wiring_auto(bus)
+        finally:
+            bus.close()
+        sys.exit(0 if result["gnd_test"] and result["v3v3_test"] else 1)
+    
     try:
         while True:
             print("\nOptions:")
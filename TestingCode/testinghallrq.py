@@ -1,14 +1,24 @@
-import smbus
+import smbus2
 import time
 
-bus = smbus.SMBus(1)
+bus = smbus2.SMBus(1)
 address = 0x48
+INTERVAL = 0.2
 time.sleep(0.5)
 
+next_t = time.monotonic()
 while True:
-    bus.write_byte(address, 0x40)
-    value = bus.read_byte(address)
+    # Control byte + read in one transaction; byte 0 is the stale conversion
+    write = smbus2.i2c_msg.write(address, [0x40])
+    read = smbus2.i2c_msg.read(address, 2)
+    bus.i2c_rdwr(write, read)
+    value = list(read)[1]
 
     print(value)
 
-    time.sleep(0.2)
\ No newline at end of file
+    # Sleep to the next fixed deadline; drop ticks if we overran
+    next_t += INTERVAL
+    now = time.monotonic()
+    if now > next_t:
+        next_t += (now - next_t) // INTERVAL * INTERVAL + INTERVAL
+    time.sleep(next_t - now)
\ No newline at end of file
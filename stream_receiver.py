@@ -12,33 +12,86 @@ Usage
     # Custom port
     python stream_receiver.py --port 5000
 
+    # Force software decoding (default tries the Pi's V4L2 hardware decoder)
+    python stream_receiver.py --decoder sw
+
+The pipeline runs in-process through PyGObject (``Gst.parse_launch``) when
+the bindings are installed, otherwise (or with ``--gst-launch``) in a
+``gst-launch-1.0`` subprocess.
+
 Pipeline
 --------
     udpsrc port=5000
     ! application/x-rtp,encoding-name=H264,payload=96
     ! rtpjitterbuffer                     ← smooths network jitter
     ! rtph264depay                        ← extracts H.264 from RTP
-    ! avdec_h264                          ← decodes H.264 to raw video
+    ! h264parse
+    ! v4l2h264dec | vaapih264dec | avdec_h264   ← per --decoder
+    ! queue max-size-buffers=2 leaky=downstream   ← drops late decoded frames
     ! videoconvert                        ← colourspace for the video sink
     ! autovideosink                       ← platform-native display window
 
 Requires
 --------
     GStreamer 1.x with gst-plugins-good, gst-plugins-bad, gst-libav.
+    Optional: PyGObject (``python3-gi`` + ``gir1.2-gstreamer-1.0``) for
+    in-process playback.
 """
 from __future__ import annotations
 
 import argparse
 import logging
+import os
 import shutil
 import subprocess
 import signal
 import sys
+from typing import Optional
 
 logger = logging.getLogger("falconia.receiver")
 
+# --decoder choice → GStreamer H.264 decoder element.
+DECODERS = {
+    "sw": "avdec_h264",      # gst-libav, CPU
+    "v4l2": "v4l2h264dec",   # Raspberry Pi VideoCore (V4L2 M2M)
+    "vaapi": "vaapih264dec", # Intel/AMD VA-API
+}
+SW_DECODER = DECODERS["sw"]
+
+
+def _gst_element_available(element: str) -> bool:
+    """Return *True* if ``gst-inspect-1.0`` can find the given element."""
+    gst_inspect = shutil.which("gst-inspect-1.0")
+    if gst_inspect is None:
+        return False
+    try:
+        proc = subprocess.run(
+            [gst_inspect, element],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            timeout=5,
+            env={**os.environ, "GST_PAGER": "cat", "PAGER": "cat"},
+        )
+    except Exception:
+        return False
+    return proc.returncode == 0
+
+
+def resolve_decoder(choice: str) -> str:
+    """Return the decoder element for *choice*, falling back to ``avdec_h264``."""
+    element = DECODERS[choice]
+    if element != SW_DECODER and not _gst_element_available(element):
+        logger.warning("%s not available – falling back to %s.", element, SW_DECODER)
+        return SW_DECODER
+    return element
+
 
-def build_receiver_command(port: int = 5000, latency: int = 200) -> list[str]:
+def build_receiver_command(
+    port: int = 5000,
+    latency: int = 200,
+    decoder: str = SW_DECODER,
+) -> list[str]:
     """Build the ``gst-launch-1.0`` command list for receiving a stream.
 
     Parameters
@@ -47,6 +100,8 @@ def build_receiver_command(port: int = 5000, latency: int = 200) -> list[str]:
         UDP port to listen on.
     latency : int
         Jitter-buffer latency in milliseconds.
+    decoder : str
+        H.264 decoder element (see ``DECODERS`` / ``resolve_decoder``).
     """
     return [
         "gst-launch-1.0", "-e",
@@ -62,8 +117,15 @@ def build_receiver_command(port: int = 5000, latency: int = 200) -> list[str]:
         # rtph264depay: extract the H.264 NALUs from RTP packets
         "rtph264depay",
         "!",
-        # avdec_h264: decode H.264 → raw video frames
-        "avdec_h264",
+        # h264parse: frame the byte-stream for (hardware) decoders
+        "h264parse",
+        "!",
+        # decode H.264 → raw video frames
+        decoder,
+        "!",
+        # Bounded leaky queue on decoded frames: drop old frames rather than
+        # buffer if the display falls behind (never drop compressed NALUs)
+        "queue", "max-size-buffers=2", "leaky=downstream",
         "!",
         # videoconvert: convert pixel formats for the display sink
         "videoconvert",
@@ -73,6 +135,72 @@ def build_receiver_command(port: int = 5000, latency: int = 200) -> list[str]:
     ]
 
 
+def build_pipeline_str(
+    port: int = 5000,
+    latency: int = 200,
+    decoder: str = SW_DECODER,
+) -> str:
+    """Return the receiver pipeline as a ``Gst.parse_launch`` string.
+
+    Same elements as ``build_receiver_command``, without the
+    ``gst-launch-1.0 -e`` prefix.
+    """
+    return " ".join(build_receiver_command(port, latency, decoder)[2:])
+
+
+def run_in_process(pipeline_str: str) -> Optional[int]:
+    """Run *pipeline_str* inside this process via PyGObject.
+
+    Returns the exit code (0 on EOS / Ctrl-C, 1 on a pipeline error), or
+    *None* if PyGObject / GStreamer bindings are not installed.  Ctrl-C
+    sends EOS first (like ``gst-launch-1.0 -e``) and the pipeline is set
+    to NULL on the way out.
+    """
+    try:
+        import gi
+        gi.require_version("Gst", "1.0")
+        from gi.repository import GLib, Gst
+    except (ImportError, ValueError) as exc:
+        logger.info("PyGObject GStreamer bindings unavailable (%s).", exc)
+        return None
+
+    Gst.init(None)
+    pipeline = Gst.parse_launch(pipeline_str)
+    loop = GLib.MainLoop()
+    status = {"code": 0}
+
+    def on_message(_bus, message) -> None:
+        if message.type == Gst.MessageType.ERROR:
+            err, debug = message.parse_error()
+            logger.error("Pipeline error: %s (%s)", err.message, debug)
+            status["code"] = 1
+            loop.quit()
+        elif message.type == Gst.MessageType.EOS:
+            loop.quit()
+
+    def on_sigint() -> bool:
+        logger.info("Interrupted – shutting down receiver.")
+        pipeline.send_event(Gst.Event.new_eos())
+        # Don't wait forever for EOS to drain through the sink
+        GLib.timeout_add_seconds(5, lambda: loop.quit() or False)
+        return GLib.SOURCE_REMOVE
+
+    bus = pipeline.get_bus()
+    bus.add_signal_watch()
+    bus.connect("message", on_message)
+    GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signal.SIGINT, on_sigint)
+
+    try:
+        if pipeline.set_state(Gst.State.PLAYING) == Gst.StateChangeReturn.FAILURE:
+            logger.error("Could not start the receiver pipeline.")
+            return 1
+        loop.run()
+    finally:
+        pipeline.set_state(Gst.State.NULL)
+        bus.remove_signal_watch()
+    return status["code"]
+
+
 def main() -> None:
     logging.basicConfig(
         level=logging.INFO,
@@ -84,15 +212,38 @@ def main() -> None:
     )
     parser.add_argument("--port", type=int, default=5000, help="UDP port to listen on")
     parser.add_argument("--latency", type=int, default=200, help="Jitter-buffer latency (ms)")
+    parser.add_argument(
+        "--decoder", choices=sorted(DECODERS), default="v4l2",
+        help="H.264 decoder: v4l2 (Pi hardware), vaapi (PC GPU) or sw; "
+             "unavailable hardware decoders fall back to sw (default: v4l2)",
+    )
+    parser.add_argument(
+        "--gst-launch", action="store_true",
+        help="Run the pipeline in a gst-launch-1.0 subprocess instead of in-process",
+    )
     args = parser.parse_args()
 
+    decoder = resolve_decoder(args.decoder)
+    logger.info("Starting receiver on UDP port %d (%s) …", args.port, decoder)
+
+    if not args.gst_launch:
+        pipeline_str = build_pipeline_str(port=args.port, latency=args.latency, decoder=decoder)
+        logger.debug("Pipeline: %s", pipeline_str)
+        try:
+            code = run_in_process(pipeline_str)
+        except Exception as exc:
+            logger.error("Receiver failed: %s", exc)
+            sys.exit(1)
+        if code is not None:
+            sys.exit(code)
+        logger.info("Falling back to gst-launch-1.0.")
+
     # Pre-flight check
     if not shutil.which("gst-launch-1.0"):
         logger.error("gst-launch-1.0 not found. Install GStreamer first.")
         sys.exit(1)
 
-    cmd = build_receiver_command(port=args.port, latency=args.latency)
-    logger.info("Starting receiver on UDP port %d …", args.port)
+    cmd = build_receiver_command(port=args.port, latency=args.latency, decoder=decoder)
     logger.debug("Command: %s", " ".join(cmd))
 
     try:
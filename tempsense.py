@@ -1,13 +1,54 @@
-import glob, time
+import glob, os, time
 
 device = glob.glob('/sys/bus/w1/devices/28-*')[0] + '/w1_slave'
+INTERVAL = 1
 
+# Dallas/Maxim CRC-8 (poly x^8 + x^5 + x^4 + 1, reflected 0x8C), one table
+# lookup per byte
+def _crc8_entry(byte):
+  for _ in range(8):
+    byte = (byte >> 1) ^ 0x8C if byte & 1 else byte >> 1
+  return byte
+
+CRC8_TABLE = bytes(_crc8_entry(i) for i in range(256))
+
+def crc8(data):
+  crc = 0
+  for byte in data:
+    crc = CRC8_TABLE[crc ^ byte]
+  return crc
+
+def read_temp():
+  # Raw unbuffered read; w1_slave is under 100 bytes
+  fd = os.open(device, os.O_RDONLY)
+  try:
+    raw = os.read(fd, 128)
+  finally:
+    os.close(fd)
+  # Line 1: "<9 scratchpad bytes> : crc=xx YES|NO", line 2: "... t=<milli-C>"
+  status, _, data = raw.partition(b"\n")
+  if not status.rstrip().endswith(b"YES"):
+    return None
+  try:
+    scratchpad = bytes.fromhex(status.partition(b":")[0].decode())
+  except ValueError:
+    return None
+  # CRC over all 9 bytes (8 data + CRC) is 0 when the CRC matches
+  if len(scratchpad) != 9 or crc8(scratchpad) != 0:
+    return None
+  head, sep, temp = data.rpartition(b"t=")
+  if not sep:
+    return None
+  return int(temp) / 1000
+
+start = time.monotonic()
+tick = 0
 while True:
-  with open(device, 'r') as f:
-    raw = f.read()
-  if "t=" in raw:
-    temp = raw.split("t=")[-1]
-    print(float(temp) / 1000)
+  temp = read_temp()
+  if temp is not None:
+    print(temp)
   else:
     print("smth wrong happened wait a bit")
-  time.sleep(1)
+  # Readings land on start + n*INTERVAL; a slow read skips to the next slot
+  tick = max(tick + 1, int((time.monotonic() - start) / INTERVAL) + 1)
+  time.sleep(max(0, start + tick * INTERVAL - time.monotonic()))
\ No newline at end of file